@@ -0,0 +1,156 @@
+"""심볼/인터벌별 OHLCV 메모리 맵 컬럼 저장소
+
+레이아웃: <root>/<interval>/<symbol>/<column>.npy
+  Date   - int64 (ns, 캔들 시작 시각, 오름차순)
+  Open, High, Low, Close, Volume, Value - float64
+
+읽기는 np.load(mmap_mode='r')로 열어 페이지 캐시를 공유하므로, 여러 워커
+프로세스가 같은 파일을 읽어도 DataFrame을 피클링하거나 복사하지 않습니다.
+열린 memmap은 최근 사용 순으로 최대 max_open개(BAR_STORE_MAX_OPEN)까지 유지합니다.
+"""
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Value']
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+MAX_OPEN = int(os.getenv('BAR_STORE_MAX_OPEN', 64))  # 동시에 열어 둘 (심볼, 인터벌) 수
+
+
+class BarStore:
+    """메모리 맵 기반 OHLCV 저장소"""
+
+    def __init__(self, root="data", max_open=MAX_OPEN):
+        self.root = root
+        self.max_open = max_open
+        self._maps = OrderedDict()
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, interval, symbol)
+
+    def exists(self, symbol, interval):
+        return os.path.exists(os.path.join(self.path(symbol, interval), 'Date.npy'))
+
+    def symbols(self, interval):
+        """저장된 심볼 목록"""
+        interval_dir = os.path.join(self.root, interval)
+        if not os.path.isdir(interval_dir):
+            return []
+        return sorted(s for s in os.listdir(interval_dir) if self.exists(s, interval))
+
+    def write(self, symbol, interval, df, merge=True):
+        """DataFrame(index=Date)을 컬럼 파일로 저장 (merge=True면 기존 데이터와 합쳐 중복 제거)"""
+        if merge and self.exists(symbol, interval):
+            existing = self.get_frame(symbol, interval, columns=COLUMNS)
+            df = pd.concat([existing, df[COLUMNS]])
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+
+        out_dir = self.path(symbol, interval)
+        os.makedirs(out_dir, exist_ok=True)
+        self._maps.pop((symbol, interval), None)
+
+        arrays = {'Date': df.index.values.astype('datetime64[ns]').astype(np.int64)}
+        for col in COLUMNS:
+            arrays[col] = df[col].to_numpy(dtype=np.float64)
+        # Date를 마지막에 교체하여 중단 시에도 exists() 기준으로 일관성 유지
+        for name in COLUMNS + ['Date']:
+            tmp_path = os.path.join(out_dir, f"{name}.tmp.npy")
+            np.save(tmp_path, np.ascontiguousarray(arrays[name]))
+            os.replace(tmp_path, os.path.join(out_dir, f"{name}.npy"))
+        return out_dir
+
+    def columns(self, symbol, interval):
+        """컬럼별 읽기 전용 memmap 배열 (프로세스 내에서 재사용)"""
+        key = (symbol, interval)
+        if key in self._maps:
+            self._maps.move_to_end(key)
+        else:
+            base = self.path(symbol, interval)
+            if not self.exists(symbol, interval):
+                raise KeyError(f"No bars stored for {symbol} {interval}")
+            self._maps[key] = {
+                name: np.load(os.path.join(base, f"{name}.npy"), mmap_mode='r')
+                for name in ['Date'] + COLUMNS
+            }
+            while len(self._maps) > self.max_open:
+                self._maps.popitem(last=False)
+        return self._maps[key]
+
+    def locate(self, symbol, interval, start=None, end=None, count=None):
+        """[start, end) 구간의 위치 범위 (timestamp 인덱스 이진 탐색)"""
+        dates = self.columns(symbol, interval)['Date']
+        lo = 0 if start is None else int(np.searchsorted(dates, pd.Timestamp(start).value, side='left'))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, pd.Timestamp(end).value, side='left'))
+        if count is not None:
+            lo = max(lo, hi - count)
+        return lo, hi
+
+    def get_arrays(self, symbol, interval, start=None, end=None, count=None):
+        """구간에 해당하는 컬럼별 zero-copy 슬라이스"""
+        lo, hi = self.locate(symbol, interval, start, end, count)
+        return {name: values[lo:hi] for name, values in self.columns(symbol, interval).items()}
+
+    def get_frame(self, symbol, interval, start=None, end=None, count=None, columns=OHLCV):
+        """download_data와 같은 형식(index=Date)의 DataFrame. 컬럼은 memmap 슬라이스를 그대로 참조"""
+        arrays = self.get_arrays(symbol, interval, start, end, count)
+        index = pd.DatetimeIndex(arrays['Date'].view('datetime64[ns]'), name='Date')
+        return pd.DataFrame({col: arrays[col] for col in columns}, index=index, copy=False)
+
+    def close(self):
+        self._maps.clear()
+
+
+# 워커 프로세스마다 하나의 BarStore를 열어 memmap을 공유
+_worker_store = None
+
+
+def _init_worker(root):
+    global _worker_store
+    _worker_store = BarStore(root)
+
+
+def _call_worker(task):
+    func, symbol, kwargs = task
+    return func(_worker_store, symbol, **kwargs)
+
+
+def map_symbols(root, func, symbols, processes=None, **kwargs):
+    """func(store, symbol, **kwargs)를 워커 프로세스에서 심볼별로 실행
+
+    워커에는 심볼 이름만 전달되고 데이터는 각 워커가 memmap으로 직접 읽습니다.
+    func는 모듈 최상위 함수여야 합니다 (피클링 가능).
+    """
+    tasks = [(func, symbol, kwargs) for symbol in symbols]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(root,)) as executor:
+        return list(executor.map(_call_worker, tasks, chunksize=max(1, len(tasks) // 64)))
+
+
+def backtest_symbol(store, symbol, interval, start=None, end=None, count=None, export=None, run_id=None):
+    """저장소 데이터로 한 심볼 MRHA 백테스트 후 get_results 반환 (export 경로가 있으면 Parquet로도 저장)"""
+    from class_mrha import MRHATradingSystem
+
+    try:
+        bot = MRHATradingSystem(symbol, interval, count, bar_store=store, start=start, end=end)
+        bot.run_analysis()
+        if export is not None:
+            from result_export import export_results
+            export_results(bot, export, run_id=run_id)
+        results = bot.get_results()
+        results.update({'Symbol': symbol, 'Interval': interval, 'Bars': len(bot.stock_data)})
+        return results
+    except Exception as e:
+        logger.error("Error backtesting %s %s: %s", symbol, interval, e)
+        return {'Symbol': symbol, 'Interval': interval, 'Bars': 0, 'Error': str(e)}
+
+
+def backtest_universe(root, symbols, interval, start=None, end=None, count=None, processes=None):
+    """저장소의 여러 심볼을 워커 프로세스에서 병렬 백테스트"""
+    results = map_symbols(root, backtest_symbol, symbols, processes,
+                          interval=interval, start=start, end=end, count=count)
+    return pd.DataFrame(results)
@@ -0,0 +1,118 @@
+"""로컬 BarStore 데이터로 MRHA 일괄 백테스트
+
+심볼 x 인터벌 x 기간 조합을 모든 코어의 워커 프로세스에서 run_analysis와 같은
+방식으로 백테스트하고, 결과를 하나의 표(CSV)로 저장한 뒤 처리량을 출력합니다.
+데이터는 historical_loader로 미리 받아 둔 memmap 저장소에서만 읽습니다.
+
+사용 예:
+    python batch_backtest.py --interval day --interval minute60 \\
+        --range 2023-01-01:2024-01-01 --range 2024-01-01: --output results/nightly.csv
+    python batch_backtest.py KRW-BTC KRW-ETH --interval day
+    python batch_backtest.py --interval day --export    # 심볼별 결과 Parquet 저장 (result_export.py)
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from bar_store import BarStore, backtest_symbol, map_symbols
+from log_config import setup_logging
+from result_export import EXPORT_DIR, require_pyarrow
+
+
+def parse_range(text):
+    """'시작:끝' (양쪽 모두 생략 가능) -> (start, end)"""
+    start, _, end = text.partition(':')
+    return start or None, end or None
+
+
+def _backtest_job(store, job, export=None, run_id=None):
+    """map_symbols 워커용: (심볼, 인터벌, 시작, 끝, 개수) 1건 백테스트"""
+    symbol, interval, start, end, count = job
+    started = time.perf_counter()
+    results = backtest_symbol(store, symbol, interval, start=start, end=end, count=count,
+                              export=export, run_id=run_id)
+    results.update({'Start': start, 'End': end, 'Seconds': time.perf_counter() - started})
+    return results
+
+
+def make_jobs(store, symbols, intervals, ranges, count=None):
+    """심볼(없으면 저장소 전체) x 인터벌 x 기간 조합"""
+    jobs = []
+    for interval in intervals:
+        for symbol in symbols or store.symbols(interval):
+            for start, end in ranges:
+                jobs.append((symbol, interval, start, end, count))
+    return jobs
+
+
+def run_batch(root, symbols=None, intervals=("day",), ranges=((None, None),), count=None,
+              processes=None, export=None, run_id=None):
+    """일괄 백테스트 후 (결과 DataFrame, 처리량 dict) 반환
+
+    export 경로가 주어지면 심볼별 mrha_data/backtest_results/trades를 run_id로 Parquet 저장
+    """
+    if export is not None:
+        require_pyarrow()  # 워커마다 실패하기 전에 확인
+    jobs = make_jobs(BarStore(root), symbols, intervals, ranges, count)
+    started = time.perf_counter()
+    results = map_symbols(root, _backtest_job, jobs, processes, export=export,
+                          run_id=run_id) if jobs else []
+    elapsed = time.perf_counter() - started
+
+    table = pd.DataFrame(results)
+    leading = ['Symbol', 'Interval', 'Start', 'End', 'Bars']
+    if len(table):
+        table = table[leading + [c for c in table.columns if c not in leading]]
+    bars = int(table['Bars'].sum()) if len(table) else 0
+    throughput = {
+        'jobs': len(jobs),
+        'errors': int(table['Error'].notna().sum()) if 'Error' in table else 0,
+        'bars': bars,
+        'seconds': elapsed,
+        'bars_per_sec': bars / elapsed if elapsed > 0 else 0.0,
+        'symbols_per_sec': len(jobs) / elapsed if elapsed > 0 else 0.0,
+    }
+    return table, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 저장소 데이터로 MRHA 일괄 백테스트")
+    parser.add_argument("symbols", nargs="*", help="생략하면 저장소의 모든 심볼")
+    parser.add_argument("--interval", action="append", dest="intervals",
+                        help="여러 번 지정 가능 (기본 day)")
+    parser.add_argument("--range", action="append", dest="ranges", type=parse_range,
+                        help="시작:끝 (예: 2024-01-01:2024-07-01, 여러 번 지정 가능)")
+    parser.add_argument("--count", type=int, default=None, help="구간 마지막 N개 캔들만 사용")
+    parser.add_argument("--root", default="data")
+    parser.add_argument("--processes", type=int, default=None, help="워커 수 (기본: 코어 수)")
+    parser.add_argument("--output", default=None,
+                        help="결과 CSV 경로 (기본 results/backtest_<시각>.csv)")
+    parser.add_argument("--export", nargs="?", const=EXPORT_DIR, default=None,
+                        help=f"심볼별 결과를 Parquet로 저장할 경로 (기본 {EXPORT_DIR}, pyarrow 필요)")
+    args = parser.parse_args()
+    setup_logging()
+
+    run_id = f"{datetime.now():%Y%m%d_%H%M%S}"
+    table, throughput = run_batch(args.root, args.symbols, args.intervals or ["day"],
+                                  args.ranges or [(None, None)], args.count, args.processes,
+                                  export=args.export, run_id=f"batch_{run_id}")
+
+    output = args.output or os.path.join('results', f"backtest_{run_id}.csv")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    table.to_csv(output, index=False)
+
+    print(f"{throughput['jobs']}개 백테스트 ({throughput['errors']}개 실패), "
+          f"{throughput['bars']:,}개 캔들, {throughput['seconds']:.1f}초")
+    print(f"처리량: {throughput['bars_per_sec']:,.0f} bars/sec, "
+          f"{throughput['symbols_per_sec']:.2f} symbols/sec")
+    print(f"결과: {output}")
+    if args.export:
+        print(f"Parquet: {args.export} (run=batch_{run_id})")
+
+
+if __name__ == "__main__":
+    main()
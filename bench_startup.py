@@ -0,0 +1,80 @@
+"""트레이더 진입점 콜드 스타트 벤치마크
+
+새 파이썬 프로세스에서 realtime_trader를 import하는 데 걸리는 시간과
+최대 RSS를 측정하고, 기동 예산(budget)을 넘으면 0이 아닌 코드로 종료합니다.
+
+사용 예:
+    python bench_startup.py --runs 5 --max-import-ms 1500 --max-rss-mb 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# 자식 프로세스에서 실행되는 측정 코드
+_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss_kb //= 1024
+print(json.dumps({{
+    'import_ms': elapsed * 1000,
+    'max_rss_mb': rss_kb / 1024,
+    'plotly_loaded': any(m == 'plotly' or m.startswith('plotly.') for m in sys.modules),
+}}))
+"""
+
+
+def measure_startup(module="realtime_trader"):
+    """새 인터프리터에서 모듈 import 시간/RSS 1회 측정"""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="트레이더 기동 시간/메모리 벤치마크")
+    parser.add_argument("--module", default="realtime_trader")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float,
+                        default=float(os.getenv("STARTUP_BUDGET_MS", 1500)))
+    parser.add_argument("--max-rss-mb", type=float,
+                        default=float(os.getenv("STARTUP_BUDGET_RSS_MB", 150)))
+    args = parser.parse_args()
+
+    samples = [measure_startup(args.module) for _ in range(args.runs)]
+    import_ms = statistics.median(s['import_ms'] for s in samples)
+    rss_mb = max(s['max_rss_mb'] for s in samples)
+    plotly_loaded = any(s['plotly_loaded'] for s in samples)
+
+    print(f"module: {args.module} ({args.runs} runs)")
+    print(f"import time (median): {import_ms:.1f} ms (budget {args.max_import_ms:.0f} ms)")
+    print(f"max RSS: {rss_mb:.1f} MB (budget {args.max_rss_mb:.0f} MB)")
+    print(f"plotly loaded: {plotly_loaded}")
+
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append("import time over budget")
+    if rss_mb > args.max_rss_mb:
+        failures.append("RSS over budget")
+    if plotly_loaded:
+        failures.append("plotly imported at startup")
+    if failures:
+        print("FAIL: " + ", ".join(failures))
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
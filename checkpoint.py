@@ -0,0 +1,78 @@
+"""run_trading_system 단계별 체크포인트
+
+하루 실행의 각 단계 결과(잔고/포트폴리오, 유니버스, 티커별 시그널, 시그널
+게시 여부, 실행 진행 상황)를 state/checkpoints/<날짜>/<단계>.json에 원자적으로
+저장합니다. 크래시 후 재시작하면 완료된 단계는 건너뛰고 남은 주문을 바로
+이어서 처리합니다.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+
+CHECKPOINT_ROOT = os.getenv('CHECKPOINT_DIR', 'state/checkpoints')
+MAX_ATTEMPTS = 3  # 같은 날 재시도 최대 횟수
+
+
+class RunCheckpoint:
+    """하루치 실행의 단계별 체크포인트"""
+
+    def __init__(self, date=None, root=CHECKPOINT_ROOT):
+        self.date = date or datetime.now().strftime('%Y-%m-%d')
+        self.dir = os.path.join(root, self.date)
+        self.root = root
+
+    def _path(self, stage):
+        return os.path.join(self.dir, f"{stage}.json")
+
+    def has(self, stage):
+        return os.path.exists(self._path(stage))
+
+    def load(self, stage, default=None):
+        try:
+            with open(self._path(stage), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+
+    def save(self, stage, data):
+        """임시 파일에 쓴 뒤 교체 (중단 시 깨진 체크포인트가 남지 않도록)"""
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_path = self._path(stage) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(stage))
+        return data
+
+    def started(self):
+        return os.path.isdir(self.dir)
+
+    def completed(self):
+        return self.has('complete')
+
+    def in_progress(self):
+        """시작했지만 완료/포기되지 않은 실행인지"""
+        return (self.started() and not self.completed() and not self.has('abandoned'))
+
+    def begin_attempt(self):
+        """재시도 횟수 기록, 최대 횟수를 넘으면 포기 처리 후 False 반환"""
+        attempts = self.load('attempts', 0) + 1
+        self.save('attempts', attempts)
+        if attempts > MAX_ATTEMPTS:
+            self.save('abandoned', {'at': datetime.now().isoformat(), 'attempts': attempts - 1})
+            return False
+        return True
+
+    def mark_complete(self):
+        self.save('complete', {'at': datetime.now().isoformat()})
+
+    def prune(self, keep_days=7):
+        """keep_days일보다 오래된 체크포인트 디렉터리 삭제"""
+        if not os.path.isdir(self.root):
+            return
+        cutoff = (datetime.now() - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+        for name in os.listdir(self.root):
+            if name < cutoff:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
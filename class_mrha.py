@@ -1,24 +1,65 @@
+import os
 import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pyupbit
+import logging
+
+from performance_metrics import DEFAULT_WINDOWS, OnlineMetrics, periods_per_year
+from profiling import stage
+from signal_cache import data_hash
+from tracing import span
+
+# 지표/매매 로직이 바뀌면 올려서 이전 캐시 결과를 무효화
+STRATEGY_VERSION = 2
+# 캐시에 저장할 지표 마지막 구간 길이
+CACHE_TAIL_ROWS = 30
+# 계산 백엔드: pandas(기준 구현) / numpy / numba (mrha_backends.py 참고)
+MRHA_BACKEND = os.getenv("MRHA_BACKEND", "pandas")
+
+logger = logging.getLogger(__name__)
+
+def summarize_performance(portfolio, total_trades, periods=365, windows=DEFAULT_WINDOWS):
+    """Total_Value 컬럼을 가진 포트폴리오 이력을 한 번 훑어 성과 지표 계산"""
+    metrics = OnlineMetrics(periods, windows)
+    if 'Holdings_Value' in portfolio:
+        exposed = portfolio['Holdings_Value'].to_numpy(dtype=float) > 0
+    elif 'Holdings' in portfolio:
+        exposed = portfolio['Holdings'].to_numpy(dtype=float) > 0
+    else:
+        exposed = np.zeros(len(portfolio), dtype=bool)
+    for value, in_position in zip(portfolio['Total_Value'].to_numpy(dtype=float), exposed):
+        metrics.update(value, in_position)
+    metrics.record_trade(total_trades)
+    return metrics.results()
 
 
 class MRHATradingSystem:
 
-    def __init__(self, symbol, interval, count):
+    def __init__(self, symbol, interval, count, bar_store=None, start=None, end=None, backend=None):
         self.symbol = symbol
         self.interval = interval
         self.count = count
+        # 결과는 백엔드와 무관하게 같으므로 캐시 키(get_params)에는 넣지 않음
+        self.backend = backend or MRHA_BACKEND
+        # bar_store가 주어지면 업비트 대신 로컬 memmap 저장소에서 읽음
+        self.bar_store = bar_store
+        self.start = start
+        self.end = end
         self.stock_data = None
         self.mrha_data = None
         self.backtest_results = None
         self.trades = None
+        self.cached_results = None
+        self.metrics = None
 
     def download_data(self):
+        if self.bar_store is not None:
+            self.stock_data = self.bar_store.get_frame(self.symbol, self.interval,
+                                                       start=self.start, end=self.end, count=self.count)
+            return self.stock_data
+
         df = pyupbit.get_ohlcv(self.symbol, interval=self.interval, count=self.count)
         df = df.rename(columns=lambda x: x.capitalize())
         df = df.drop(columns='Value')
@@ -142,6 +183,9 @@ class MRHATradingSystem:
         
         trades = []
         position = 0
+        # 봉마다 갱신하는 성과 지표 (get_results에서 이력을 다시 훑지 않음)
+        metrics = OnlineMetrics(self.periods_per_year(), DEFAULT_WINDOWS)
+        metrics.update(initial_capital)
         
         for i in range(1, len(self.mrha_data)):
             current_price = self.mrha_data['mh_close'].iloc[i]
@@ -154,6 +198,7 @@ class MRHATradingSystem:
                 portfolio.loc[portfolio.index[i], 'Cash'] = portfolio.loc[portfolio.index[i-1], 'Cash'] - cost
                 position = 1
                 trades.append({'Date': self.mrha_data.index[i], 'Type': 'Buy', 'Price': current_price, 'Shares': shares_to_buy})
+                metrics.record_trade()
             elif signal == -1 and position == 1:
                 shares_to_sell = portfolio.loc[portfolio.index[i-1], 'Holdings']
                 revenue = shares_to_sell * current_price * (1 - commission)
@@ -161,11 +206,13 @@ class MRHATradingSystem:
                 portfolio.loc[portfolio.index[i], 'Cash'] = portfolio.loc[portfolio.index[i-1], 'Cash'] + revenue
                 position = 0
                 trades.append({'Date': self.mrha_data.index[i], 'Type': 'Sell', 'Price': current_price, 'Shares': shares_to_sell})
+                metrics.record_trade()
             else:
                 portfolio.loc[portfolio.index[i], 'Holdings'] = portfolio.loc[portfolio.index[i-1], 'Holdings']
                 portfolio.loc[portfolio.index[i], 'Cash'] = portfolio.loc[portfolio.index[i-1], 'Cash']
             
             portfolio.loc[portfolio.index[i], 'Total_Value'] = portfolio.loc[portfolio.index[i], 'Holdings'] * current_price + portfolio.loc[portfolio.index[i], 'Cash']
+            metrics.update(portfolio.loc[portfolio.index[i], 'Total_Value'], exposed=position == 1)
             if portfolio.loc[portfolio.index[i-1], 'Total_Value'] != 0:
                 portfolio.loc[portfolio.index[i], 'Returns'] = (portfolio.loc[portfolio.index[i], 'Total_Value'] / portfolio.loc[portfolio.index[i-1], 'Total_Value']) - 1
             else:
@@ -173,110 +220,100 @@ class MRHATradingSystem:
         
         self.backtest_results = portfolio
         self.trades = pd.DataFrame(trades)
+        self.metrics = metrics
+
+    def compute(self):
+        """stock_data로 지표/시그널/백테스트 계산 (self.backend로 구현 선택)"""
+        if self.backend == 'pandas':
+            rha_data = self.calculate_revised_heikin_ashi()
+            self.mrha_data = self.calculate_mrha(rha_data)
+            self.add_trading_signals()
+            self.calculate_price_targets()
+            self.calculate_td_setup()
+            self.implement_trading_logic()
+            self.run_backtest()
+            return
+        from mrha_backends import compute
+        self.mrha_data, self.backtest_results, self.trades, self.metrics = compute(
+            self.stock_data, self.backend, periods_per_year=self.periods_per_year())
+
+    def periods_per_year(self):
+        """연율화에 쓸 연간 봉 수 (암호화폐 365일 기준)"""
+        return periods_per_year(self.interval)
+
+    def get_params(self):
+        """결과에 영향을 주는 파라미터 (캐시 키에 사용)"""
+        return {
+            'strategy_version': STRATEGY_VERSION,
+            'count': self.count,
+            'start': str(self.start) if self.start is not None else None,
+            'end': str(self.end) if self.end is not None else None,
+        }
 
-    def run_analysis(self):
-        self.download_data()
-        rha_data = self.calculate_revised_heikin_ashi()
-        self.mrha_data = self.calculate_mrha(rha_data)
-        self.add_trading_signals()
-        self.calculate_price_targets()
-        self.calculate_td_setup()
-        self.implement_trading_logic()
-        self.run_backtest()
+    def run_analysis(self, cache=None):
+        """데이터를 받아 분석/백테스트 실행. cache(SignalCache)에 같은 입력 결과가 있으면 재사용"""
+        with span('fetch', interval=self.interval), stage('fetch'):
+            self.download_data()
+        if cache is not None:
+            last_bar = self.stock_data.index[-1]
+            digest = data_hash(self.stock_data)
+            entry = cache.get(self.symbol, self.interval, last_bar, self.get_params(), data_hash=digest)
+            if entry is not None:
+                self._restore_cache_entry(entry)
+                return
+
+        with span('compute', bars=len(self.stock_data)), stage('compute'):
+            self.compute()
+
+        if cache is not None:
+            cache.put(self.symbol, self.interval, last_bar, self.get_params(), digest, {
+                'mrha_tail': self.mrha_data.tail(CACHE_TAIL_ROWS),
+                'trades': self.trades,
+                'results': self.get_results(),
+            })
+
+    def load_cached(self, cache, last_bar):
+        """다운로드 없이 마지막 봉 시각 기준으로 캐시된 결과 복원 (없으면 False)"""
+        entry = cache.get(self.symbol, self.interval, last_bar, self.get_params())
+        if entry is None:
+            return False
+        self._restore_cache_entry(entry)
+        return True
+
+    def _restore_cache_entry(self, entry):
+        # 캐시에는 지표 마지막 구간만 있으므로 전체 백테스트 이력은 비워 둠
+        self.mrha_data = entry['mrha_tail']
+        self.trades = entry['trades']
+        self.cached_results = entry['results']
+        self.backtest_results = None
+
+    def release(self):
+        """분석에 쓴 DataFrame 참조 해제 (결과 요약은 cached_results로 유지)"""
+        if self.backtest_results is not None:
+            self.cached_results = self.get_results()
+        self.stock_data = None
+        self.mrha_data = None
+        self.backtest_results = None
+        self.trades = None
+        self.metrics = None
 
     def get_results(self):
-        total_return = (self.backtest_results['Total_Value'].iloc[-1] / self.backtest_results['Total_Value'].iloc[0]) - 1
-        annualized_return = (1 + total_return) ** (252 / len(self.backtest_results)) - 1
-        
-        returns = self.backtest_results['Returns'].dropna()
-        if len(returns) > 0 and returns.std() != 0:
-            sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std()
-        else:
-            sharpe_ratio = 0
-            
-        max_drawdown = (self.backtest_results['Total_Value'] / self.backtest_results['Total_Value'].cummax() - 1).min()
-
-        results = {
-            "Final Portfolio Value": self.backtest_results['Total_Value'].iloc[-1],
-            "Total Return": total_return,
-            "Annualized Return": annualized_return,
-            "Sharpe Ratio": sharpe_ratio,
-            "Max Drawdown": max_drawdown,
-            "Total Trades": len(self.trades)
-        }
-        return results
-
-    def plot_results(self):
-        fig = make_subplots(rows=3, cols=2, shared_xaxes=True, 
-                        vertical_spacing=0.05, horizontal_spacing=0.05,
-                        subplot_titles=('MRHA Chart with TD Setup', 'Backtest Results', 'Portfolio Value', '', 'Daily Returns Distribution', ''),
-                        row_heights=[0.5, 0.3, 0.2], column_widths=[0.7, 0.3])
-
-        fig.add_trace(go.Candlestick(x=self.mrha_data.index,
-                    open=self.mrha_data['mh_open'],
-                    high=self.mrha_data['mh_high'],
-                    low=self.mrha_data['mh_low'],
-                    close=self.mrha_data['mh_close'],
-                    name='MRHA'), row=1, col=1)
-
-        # TD Buy Setup 텍스트 추가
-        buy_setup_text = self.mrha_data['TD_Buy_Setup'].replace(0, '').astype(str)
-        buy_setup_font = ['green' if x != '9' else 'darkgreen' for x in buy_setup_text]
-        buy_setup_size = [10 if x != '9' else 14 for x in buy_setup_text]
-
-        fig.add_trace(go.Scatter(
-            x=self.mrha_data.index,
-            y=self.mrha_data['mh_low'] - (self.mrha_data['mh_high'] - self.mrha_data['mh_low']) * 0.05,
-            text=buy_setup_text,
-            mode='text',
-            textposition='bottom center',
-            textfont=dict(color=buy_setup_font, size=buy_setup_size),
-            name='TD Buy Setup'
-        ), row=1, col=1)
-
-        # TD Sell Setup 텍스트 추가
-        sell_setup_text = self.mrha_data['TD_Sell_Setup'].replace(0, '').astype(str)
-        sell_setup_font = ['red' if x != '9' else 'darkred' for x in sell_setup_text]
-        sell_setup_size = [10 if x != '9' else 14 for x in sell_setup_text]
-
-        fig.add_trace(go.Scatter(
-            x=self.mrha_data.index,
-            y=self.mrha_data['mh_high'] + (self.mrha_data['mh_high'] - self.mrha_data['mh_low']) * 0.1,
-            text=sell_setup_text,
-            mode='text',
-            textposition='top center',
-            textfont=dict(color=sell_setup_font, size=sell_setup_size),
-            name='TD Sell Setup'
-        ), row=1, col=1)
-
-        for _, trade in self.trades.iterrows():
-            if trade['Type'] == 'Buy':
-                fig.add_annotation(x=trade['Date'], y=self.mrha_data.loc[trade['Date'], 'mh_low'],
-                               text="Buy", showarrow=True, arrowhead=1, arrowcolor="green", arrowsize=1.5,
-                               arrowwidth=2, ax=0, ay=40, row=1, col=1)
-            elif trade['Type'] == 'Sell':
-                fig.add_annotation(x=trade['Date'], y=self.mrha_data.loc[trade['Date'], 'mh_high'],
-                               text="Sell", showarrow=True, arrowhead=1, arrowcolor="red", arrowsize=1.5,
-                               arrowwidth=2, ax=0, ay=-40, row=1, col=1)
-
-        fig.add_trace(go.Scatter(x=self.backtest_results.index, y=self.backtest_results['Total_Value'],
-                             mode='lines', name='Portfolio Value'), row=2, col=1)
-
-        fig.add_trace(go.Histogram(x=self.backtest_results['Returns'].dropna(), 
-                               name='Daily Returns', nbinsx=50), row=3, col=1)
-
-        results = self.get_results()
-        results_text = '<br>'.join([f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}" for key, value in results.items()])
-        fig.add_annotation(text=results_text, align='left', showarrow=False, xref='paper', yref='paper', x=1.02, y=0.95, row=1, col=2)
-
-        fig.update_layout(height=1200, width=1600, title_text=f"MRHA Trading System Results with TD Setup - {self.symbol}")
-        fig.update_xaxes(rangeslider_visible=False, row=1, col=1)
-        fig.update_yaxes(title_text="Price", row=1, col=1)
-        fig.update_yaxes(title_text="Portfolio Value ($)", row=2, col=1)
-        fig.update_xaxes(title_text="Daily Return", row=3, col=1)
-        fig.update_yaxes(title_text="Frequency", row=3, col=1)
-
-        return fig
+        if self.backtest_results is None and self.cached_results is not None:
+            return dict(self.cached_results)
+        if self.metrics is not None:
+            return self.metrics.results()
+        return summarize_performance(self.backtest_results, len(self.trades), self.periods_per_year())
+
+    def plot_results(self, large=None, max_points=1500):
+        # plotly는 차트를 그릴 때만 로드 (헤드리스 트레이더 기동 시 import 비용 제거)
+        # large=None이면 봉 수에 따라 대용량 모드(축약 캔들 + WebGL) 자동 선택
+        from mrha_plot import plot_results
+        return plot_results(self, large=large, max_points=max_points)
+
+    def run_monte_carlo(self, n_paths=10000, **kwargs):
+        # 봉/매매 수익률 부트스트랩으로 총수익률, 샤프, 최대낙폭 신뢰구간 계산
+        from monte_carlo import run_monte_carlo
+        return run_monte_carlo(self, n_paths, **kwargs)
 
     def get_signals(self):
         """최근 6일간의 트레이딩 시그널을 반환합니다."""
@@ -287,9 +324,9 @@ class MRHATradingSystem:
         recent_data = self.mrha_data.sort_index(ascending=True).tail(6)
         
         # 디버깅을 위한 날짜와 시그널 출력
-        print("\nRecent dates and signals:")
-        for date, signal in zip(recent_data.index, recent_data['Signal']):
-            print(f"{date}: {signal}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for date, signal in zip(recent_data.index, recent_data['Signal']):
+                logger.debug("%s %s: %s", self.symbol, date, signal)
         
         signals = []
         for i in range(len(recent_data)):
@@ -0,0 +1,250 @@
+"""장기 분봉/일봉 히스토리 병렬 다운로더
+
+업비트 캔들 API는 요청당 최대 200개 캔들만 반환하므로, 기간을 페이지로
+나누어 레이트 리밋 안에서 동시에 받아옵니다. 받은 페이지는 즉시 디스크에
+컬럼 단위(.npz)로 저장되어 중단 후 재실행 시 이어받기가 가능하고, 모든
+페이지가 모이면 중복(페이지 경계 겹침)을 제거해 BarStore에 합칩니다.
+
+사용 예:
+    python historical_loader.py KRW-BTC KRW-ETH --interval minute1 \\
+        --start 2022-01-01 --end 2024-01-01 --root data
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from pyupbit.quotation_api import get_url_ohlcv
+from pyupbit.request_api import _call_public_api
+
+from bar_store import COLUMNS, BarStore
+from log_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 200  # 업비트 캔들 API 최대 반환 개수
+# 업비트는 시간대가 없는 to를 UTC로 해석하므로 KST 오프셋을 붙여 보냄
+KST_OFFSET = '+09:00'
+# 캔들 API 응답 필드 -> BarStore 컬럼
+_CANDLE_FIELDS = {
+    'Open': 'opening_price',
+    'High': 'high_price',
+    'Low': 'low_price',
+    'Close': 'trade_price',
+    'Volume': 'candle_acc_trade_volume',
+    'Value': 'candle_acc_trade_price',
+}
+
+_INTERVAL_DELTAS = {
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+for _m in (1, 3, 5, 10, 15, 30, 60, 240):
+    _INTERVAL_DELTAS[f'minute{_m}'] = timedelta(minutes=_m)
+# pyupbit 복수형 별칭 -> 단수형
+_INTERVAL_ALIASES = {'days': 'day', 'weeks': 'week', 'months': 'month'}
+
+
+def normalize_interval(interval):
+    """pyupbit 복수형 별칭(days, weeks, months, minutes60 등)을 단수형으로 변환"""
+    return _INTERVAL_ALIASES.get(interval, interval.replace('minutes', 'minute'))
+
+
+def interval_to_timedelta(interval):
+    """pyupbit interval 문자열을 캔들 길이로 변환"""
+    try:
+        return _INTERVAL_DELTAS[normalize_interval(interval)]
+    except KeyError:
+        raise ValueError(f"Unsupported interval for paged download: {interval}")
+
+
+# 업비트 캔들 경계 기준 시각 (월요일 09:00 KST = 00:00 UTC)
+_CANDLE_ANCHOR = datetime(2024, 1, 1, 9, 0)
+
+
+def candle_start(interval, now=None):
+    """now(KST 기준 naive datetime)가 속한 캔들의 시작 시각"""
+    now = now or datetime.now()
+    delta = interval_to_timedelta(interval)
+    return _CANDLE_ANCHOR + ((now - _CANDLE_ANCHOR) // delta) * delta
+
+
+def plan_pages(start, end, interval, page_size=PAGE_SIZE):
+    """[start, end) 구간(KST)을 캔들 API to 기준 페이지 목록으로 분할 (최신 페이지부터)"""
+    span = interval_to_timedelta(interval) * page_size
+    pages = []
+    to = pd.Timestamp(end)
+    start = pd.Timestamp(start)
+    while to > start:
+        pages.append(to)
+        to = to - span
+    return pages
+
+
+def deduplicate_bars(df):
+    """페이지 경계에서 겹친 캔들 제거 후 시간순 정렬 (같은 시각은 마지막 값 유지)"""
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+class RateLimiter:
+    """스레드 간 공유되는 초당 요청 수 제한 (토큰 버킷)"""
+
+    def __init__(self, rate_per_sec):
+        self.rate = float(rate_per_sec)
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HistoricalLoader:
+    """기간 단위 OHLCV 병렬 다운로드 및 컬럼형 저장"""
+
+    def __init__(self, root="data", max_workers=4, rate_per_sec=8, max_retries=5):
+        self.root = root
+        self.store = BarStore(root)
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_per_sec)
+        self.max_retries = max_retries
+        # (심볼, 인터벌) -> 이 시각 이하를 to로 하는 페이지는 상장 전이라 비어 있음
+        self._listing_floor = {}
+        self._floor_lock = threading.Lock()
+
+    def _page_dir(self, symbol, interval):
+        return os.path.join(self.root, '_pages', interval, symbol)
+
+    def _page_path(self, symbol, interval, to):
+        return os.path.join(self._page_dir(symbol, interval), f"{to.strftime('%Y%m%d%H%M%S')}.npz")
+
+    def _request_page(self, symbol, interval, to):
+        """to(KST) 이전 최대 PAGE_SIZE개 캔들 원본 응답 (상장 전 구간이면 빈 리스트)
+
+        pyupbit.get_ohlcv는 빈 페이지를 요청 실패와 같은 None으로 돌려주므로
+        캔들 API를 직접 호출하고, 요청 예외만 호출한 쪽에서 재시도합니다.
+        """
+        contents, _ = _call_public_api(get_url_ohlcv(interval), market=symbol, count=PAGE_SIZE,
+                                       to=to.strftime('%Y-%m-%dT%H:%M:%S') + KST_OFFSET)
+        if not isinstance(contents, list):
+            raise RuntimeError(f"Unexpected candle response: {contents}")
+        return contents
+
+    def _listed_before(self, symbol, interval, to):
+        with self._floor_lock:
+            floor = self._listing_floor.get((symbol, interval))
+        return floor is None or to > floor
+
+    def _fetch_page(self, symbol, interval, to):
+        """페이지 1개 다운로드 후 즉시 저장 (이미 있으면 건너뜀, 상장 전 페이지는 빈 페이지로 저장)"""
+        path = self._page_path(symbol, interval, to)
+        if os.path.exists(path):
+            return path
+
+        contents = []
+        if self._listed_before(symbol, interval, to):
+            for attempt in range(self.max_retries):
+                self.rate_limiter.acquire()
+                try:
+                    contents = self._request_page(symbol, interval, to)
+                    break
+                except Exception as e:
+                    logger.warning("%s %s 페이지 요청 실패 (%d/%d): %s",
+                                   symbol, to, attempt + 1, self.max_retries, e)
+                time.sleep(0.5 * (2 ** attempt))
+            else:
+                raise RuntimeError(f"Failed to download {symbol} {interval} page ending {to}")
+
+            if len(contents) < PAGE_SIZE:
+                # 가장 오래된 캔들까지 받았으므로 이보다 이전 페이지는 요청하지 않음
+                with self._floor_lock:
+                    key = (symbol, interval)
+                    self._listing_floor[key] = max(to, self._listing_floor.get(key, to))
+
+        dates = pd.to_datetime([bar['candle_date_time_kst'] for bar in contents])
+        arrays = {'Date': dates.values.astype('datetime64[ns]').astype(np.int64)}
+        for col in COLUMNS:
+            arrays[col] = np.array([bar[_CANDLE_FIELDS[col]] for bar in contents], dtype=np.float64)
+
+        # 임시 파일에 쓴 뒤 교체하여 중단 시 깨진 페이지가 남지 않도록 함
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    def _merge_pages(self, paths):
+        frames = []
+        for path in paths:
+            with np.load(path) as page:
+                if len(page['Date']) == 0:
+                    continue
+                index = pd.DatetimeIndex(page['Date'].astype('datetime64[ns]'), name='Date')
+                frames.append(pd.DataFrame({col: page[col] for col in COLUMNS}, index=index))
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+        return deduplicate_bars(pd.concat(frames))
+
+    def load(self, symbol, interval, start, end=None):
+        """[start, end) 구간 히스토리를 받아 저장하고 DataFrame으로 반환
+
+        중단된 경우 같은 인자로 다시 호출하면 저장된 페이지는 건너뜁니다.
+        end를 주지 않으면 현재 캔들 시작 시각(마지막 마감 캔들까지)으로, 같은 캔들 안에서
+        다시 실행해도 페이지 경계가 바뀌지 않습니다.
+        """
+        end = pd.Timestamp(end if end is not None else candle_start(interval))
+        start = pd.Timestamp(start)
+        pages = plan_pages(start, end, interval)
+        os.makedirs(self._page_dir(symbol, interval), exist_ok=True)
+
+        logger.info("%s %s: %d개 페이지 다운로드 (%s ~ %s)", symbol, interval, len(pages), start, end)
+        paths = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch_page, symbol, interval, to) for to in pages]
+            for future in as_completed(futures):
+                paths.append(future.result())
+
+        df = self._merge_pages(paths)
+        df = df[(df.index >= start) & (df.index < end)]
+        self.store.write(symbol, interval, df)
+
+        # 병합이 끝난 페이지 파일 정리
+        for path in paths:
+            os.remove(path)
+        logger.info("%s %s: %d개 캔들 저장 완료", symbol, interval, len(df))
+        return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 장기 히스토리 병렬 다운로드")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--interval", default="minute1")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", default=None, help="기본값: 현재 캔들 시작 시각 (마감된 캔들까지)")
+    parser.add_argument("--root", default="data")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=8, help="초당 최대 요청 수")
+    args = parser.parse_args()
+    setup_logging()
+
+    loader = HistoricalLoader(args.root, max_workers=args.workers, rate_per_sec=args.rate)
+    for symbol in args.symbols:
+        loader.load(symbol, args.interval, args.start, args.end)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""구조화 로깅 설정
+
+모든 모듈은 logging.getLogger(__name__)으로 로그를 남기고, 진입점에서
+setup_logging()을 한 번 호출합니다.
+
+  - 레코드는 QueueHandler로 큐에 넣기만 하고, 실제 출력(stdout/파일)은
+    QueueListener 스레드가 담당하므로 호출 스레드가 I/O에 막히지 않습니다.
+  - 메시지는 logger.info("... %s", value) 형태의 지연 포맷을 사용하므로,
+    LOG_LEVEL보다 낮은 레벨의 로그는 문자열 포맷 비용이 들지 않습니다.
+  - log_context()/set_log_context()로 지정한 ticker, stage 등의 컨텍스트
+    필드가 모든 레코드에 붙고, LOG_FORMAT=json(기본)이면 한 줄에 JSON 하나로
+    출력되어 지연 분석 등에 바로 파싱할 수 있습니다.
+
+환경 변수: LOG_LEVEL(기본 INFO), LOG_FORMAT(json|text), LOG_FILE(선택)
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+_context = contextvars.ContextVar('log_context', default={})
+_listener = None
+
+# LogRecord 기본 속성 (extra로 넘어온 필드만 골라내기 위함)
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'context'}
+
+
+@contextmanager
+def log_context(**fields):
+    """블록 안에서 남기는 로그에 컨텍스트 필드 추가"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def get_log_context():
+    """현재 컨텍스트 필드"""
+    return _context.get()
+
+
+def set_log_context(**fields):
+    """현재 컨텍스트 필드 갱신 (None이면 제거)"""
+    merged = {**_context.get(), **fields}
+    _context.set({k: v for k, v in merged.items() if v is not None})
+
+
+class ContextFilter(logging.Filter):
+    """레코드 생성 시점의 컨텍스트 필드를 record.context에 복사"""
+
+    def filter(self, record):
+        record.context = _context.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'context', {}))
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        context = getattr(record, 'context', {})
+        if context:
+            text += ' [' + ' '.join(f"{k}={v}" for k, v in context.items()) + ']'
+        return text
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """메시지 인자만 합치고 최종 포맷은 리스너 스레드에 맡김"""
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level=None, fmt=None, log_file=None):
+    """루트 로거를 비동기 큐 핸들러로 설정 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.getenv('LOG_FORMAT', 'json')
+    log_file = log_file or os.getenv('LOG_FILE')
+    formatter = JsonFormatter() if fmt == 'json' else TextFormatter()
+
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        if os.path.dirname(log_file):
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        handlers.append(logging.handlers.WatchedFileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,93 @@
+"""장기 실행 데몬 메모리 감시
+
+사이클마다 sample()로 현재 RSS를 기록하고, 최근 window개 샘플의 선형 추세가
+growth_limit_mb 이상 증가하거나 RSS가 max_rss_mb를 넘으면 Slack으로 알립니다.
+같은 추세로 반복 알림하지 않도록 알림 후 window개 샘플 동안은 다시 알리지 않습니다.
+
+환경 변수: MEMORY_WINDOW(기본 24), MEMORY_GROWTH_ALERT_MB(기본 50),
+          MEMORY_MAX_RSS_MB(기본 0 = 사용 안 함)
+"""
+import gc
+import logging
+import os
+import resource
+import sys
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MEMORY_WINDOW = int(os.getenv('MEMORY_WINDOW', 24))
+MEMORY_GROWTH_ALERT_MB = float(os.getenv('MEMORY_GROWTH_ALERT_MB', 50))
+MEMORY_MAX_RSS_MB = float(os.getenv('MEMORY_MAX_RSS_MB', 0))
+
+
+def current_rss_mb():
+    """현재 RSS (MB). /proc가 없으면 최대 RSS로 대신함"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def linear_slope(values):
+    """샘플 간 평균 증가량 (최소제곱 기울기)"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    cov = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    var = sum((i - mean_x) ** 2 for i in range(n))
+    return cov / var
+
+
+class MemoryMonitor:
+    """사이클별 RSS 샘플링과 증가 추세 알림"""
+
+    def __init__(self, window=MEMORY_WINDOW, growth_limit_mb=MEMORY_GROWTH_ALERT_MB,
+                 max_rss_mb=MEMORY_MAX_RSS_MB, notifier=None):
+        self.window = window
+        self.growth_limit_mb = growth_limit_mb
+        self.max_rss_mb = max_rss_mb
+        self.notifier = notifier
+        self.samples = deque(maxlen=window)
+        self._quiet = 0
+
+    def sample(self, label=None):
+        """가비지 컬렉션 후 RSS 기록 및 추세 확인. 현재 RSS(MB) 반환"""
+        gc.collect()
+        rss = current_rss_mb()
+        self.samples.append((datetime.now(), rss))
+        logger.info("RSS %.1f MB%s", rss, f" ({label})" if label else "")
+        self._check(rss)
+        return rss
+
+    def growth(self):
+        """최근 window 구간에서 추세선 기준 RSS 증가량 (MB)"""
+        values = [rss for _, rss in self.samples]
+        return linear_slope(values) * (len(values) - 1)
+
+    def _check(self, rss):
+        if self._quiet > 0:
+            self._quiet -= 1
+            return
+        if self.max_rss_mb and rss > self.max_rss_mb:
+            self._alert("메모리 한도 초과", f"RSS {rss:.1f} MB > {self.max_rss_mb:.0f} MB")
+        elif len(self.samples) == self.window and self.growth() > self.growth_limit_mb:
+            first = self.samples[0][0]
+            self._alert("메모리 증가 추세",
+                        f"{first:%m-%d %H:%M} 이후 {len(self.samples)}개 사이클 동안 "
+                        f"RSS {self.growth():+.1f} MB (현재 {rss:.1f} MB)")
+
+    def _alert(self, title, message):
+        self._quiet = self.window
+        logger.warning("%s: %s", title, message)
+        if self.notifier is not None:
+            try:
+                self.notifier.notify_error(title, message)
+            except Exception as e:
+                logger.error("메모리 알림 실패: %s", e)
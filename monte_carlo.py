@@ -0,0 +1,139 @@
+"""백테스트 결과 몬테카를로 부트스트랩
+
+run_backtest 결과(봉별 Returns) 또는 매매 기록(trades)을 복원 추출해 수만 개의
+자산 곡선을 만들고, 총수익률/샤프/최대낙폭의 신뢰구간을 구합니다.
+
+  - method='iid'  : 봉/매매 수익률을 독립적으로 복원 추출
+  - method='block': 길이 block_size의 연속 구간을 원형으로 이어 붙여 추출
+                    (변동성 군집 등 자기상관 보존, 블록은 표본 길이의 1/4 이하로 줄이고
+                    그마저 2 미만이면 iid로 대체)
+  - source='bars' : backtest_results['Returns'] (봉 단위)
+  - source='trades': 매수->매도 왕복 매매 수익률 (매매 순서만 섞음, 기본 method는 iid)
+
+경로는 (경로 수, 길이) 2차원 배열로 한 번에 계산하고, chunk_size개씩 나눠
+ProcessPoolExecutor 워커에 분산합니다. 각 청크는 SeedSequence.spawn으로 만든
+독립 시드를 쓰므로 processes 수와 관계없이 seed가 같으면 결과가 같습니다.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from performance_metrics import DAYS_PER_YEAR
+
+METRICS = ['Total Return', 'Sharpe Ratio', 'Max Drawdown']
+DEFAULT_LEVELS = (0.05, 0.5, 0.95)
+
+
+def trade_returns(trades, commission=0.001):
+    """Buy -> Sell 왕복 매매별 수익률 (run_backtest와 같은 수수료 적용, 미청산 매수는 제외)"""
+    if trades is None or len(trades) == 0:
+        return np.empty(0)
+    returns = []
+    entry = None
+    for trade_type, price in zip(trades['Type'], trades['Price']):
+        if trade_type == 'Buy':
+            entry = price * (1 + commission)
+        elif trade_type == 'Sell' and entry is not None:
+            returns.append(price * (1 - commission) / entry - 1)
+            entry = None
+    return np.asarray(returns, dtype=np.float64)
+
+
+def sample_indices(rng, n, n_paths, method='iid', block_size=20):
+    """(n_paths, n) 복원 추출 인덱스"""
+    if method not in ('iid', 'block'):
+        raise ValueError(f"Unknown method: {method}")
+    # 블록이 표본에 비해 길면 모든 경로가 원래 순서의 회전이 되어 구간 폭이 0이 됨
+    block_size = min(block_size, n // 4)
+    if method == 'iid' or block_size <= 1:
+        return rng.integers(0, n, size=(n_paths, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks, 1))
+    indices = (starts + np.arange(block_size)) % n
+    return indices.reshape(n_paths, n_blocks * block_size)[:, :n]
+
+
+def path_metrics(paths, periods_per_year=DAYS_PER_YEAR):
+    """수익률 경로 배열 (n_paths, n) -> 경로별 총수익률, 샤프, 최대낙폭"""
+    equity = np.cumprod(1 + paths, axis=1)
+    total_return = equity[:, -1] - 1
+
+    std = paths.std(axis=1, ddof=1) if paths.shape[1] > 1 else np.zeros(len(paths))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, np.sqrt(periods_per_year) * paths.mean(axis=1) / std, 0.0)
+
+    # 시작 자산(1.0)도 고점으로 포함
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    max_drawdown = np.minimum((equity / peak - 1).min(axis=1), 0.0)
+    return {'Total Return': total_return, 'Sharpe Ratio': sharpe, 'Max Drawdown': max_drawdown}
+
+
+def _simulate_chunk(task):
+    returns, n_paths, method, block_size, periods_per_year, seed = task
+    rng = np.random.default_rng(seed)
+    paths = returns[sample_indices(rng, len(returns), n_paths, method, block_size)]
+    return path_metrics(paths, periods_per_year)
+
+
+def bootstrap(returns, n_paths=10000, method='block', block_size=20, periods_per_year=DAYS_PER_YEAR,
+              seed=None, processes=None, chunk_size=2000):
+    """수익률 배열을 부트스트랩해 경로별 지표 배열 dict 반환"""
+    returns = np.asarray(pd.Series(returns).dropna(), dtype=np.float64)
+    if len(returns) == 0:
+        raise ValueError("No returns to resample")
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(returns, size, method, block_size, periods_per_year, chunk_seed)
+             for size, chunk_seed in zip(sizes, seeds)]
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) == 1:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(tasks))) as executor:
+            chunks = list(executor.map(_simulate_chunk, tasks))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in METRICS}
+
+
+def confidence_intervals(metrics, levels=DEFAULT_LEVELS):
+    """지표별 {'mean', 'p5', 'p50', 'p95', ...}"""
+    intervals = {}
+    for name, values in metrics.items():
+        stats = {'mean': float(np.mean(values))}
+        for level, value in zip(levels, np.quantile(values, levels)):
+            stats[f"p{level * 100:g}"] = float(value)
+        intervals[name] = stats
+    return intervals
+
+
+def run_monte_carlo(system, n_paths=10000, source='bars', method=None, block_size=20,
+                    periods_per_year=None, levels=DEFAULT_LEVELS, seed=None, processes=None):
+    """MRHATradingSystem 백테스트 결과로 몬테카를로 신뢰구간 계산
+
+    method를 주지 않으면 봉 수익률은 block, 매매 수익률은 iid로 추출합니다.
+    """
+    if method is None:
+        method = 'iid' if source == 'trades' else 'block'
+    if periods_per_year is None:
+        periods_per_year = system.periods_per_year()
+    if source == 'bars':
+        if system.backtest_results is None:
+            raise ValueError("run_backtest() must be run before Monte Carlo on bar returns")
+        returns = system.backtest_results['Returns'].astype(float).iloc[1:]
+    elif source == 'trades':
+        returns = trade_returns(system.trades)
+        # 매매 단위 샤프는 연간 매매 횟수로 환산
+        bars = len(system.backtest_results) if system.backtest_results is not None else len(returns)
+        periods_per_year = periods_per_year * len(returns) / max(bars, 1)
+    else:
+        raise ValueError(f"Unknown source: {source}")
+
+    metrics = bootstrap(returns, n_paths, method, block_size, periods_per_year, seed, processes)
+    result = confidence_intervals(metrics, levels)
+    result['paths'] = n_paths
+    return result
@@ -0,0 +1,227 @@
+"""MRHA 지표/시그널/백테스트 계산 백엔드
+
+MRHATradingSystem(backend=...)에서 선택합니다 (기본값: 환경 변수 MRHA_BACKEND 또는 'pandas').
+  - pandas: class_mrha의 기존 행 단위 구현 (기준 구현, 여기에는 없음)
+  - numpy : 이동 평균/최댓값, TD 셋업, 매수·매도 조건 등을 배열 연산으로 계산하고,
+            순차 의존성이 있는 부분(RHA 시가 점화식, 포지션 상태 머신, 체결 루프)만
+            작은 루프로 처리
+  - numba : numpy 백엔드의 순차 루프를 numba JIT로 컴파일 (numba가 없으면 numpy로 대체)
+
+결과 컬럼/행/매매 기록은 기준 구현과 같아야 하며, mrha_equivalence.py로 검증합니다.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from performance_metrics import DEFAULT_WINDOWS, OnlineMetrics
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('pandas', 'numpy', 'numba')
+
+
+def _rha_open(open_, h_close):
+    """h_open[i] = (h_open[i-1] + h_close[i-1]) / 2"""
+    h_open = open_.copy()
+    for i in range(1, len(h_open)):
+        h_open[i] = (h_open[i - 1] + h_close[i - 1]) / 2
+    return h_open
+
+
+def _trading_logic(close, enter_long, enter_short, exit_long, exit_short):
+    """포지션 상태 머신 -> (Signal, Position, Entry_Price, Exit_Price), 이벤트가 없는 칸은 NaN"""
+    n = len(close)
+    signal = np.full(n, np.nan)
+    position_out = np.full(n, np.nan)
+    entry = np.full(n, np.nan)
+    exit_ = np.full(n, np.nan)
+    position = 0
+    for i in range(1, n):
+        if position == 0 and enter_long[i]:
+            signal[i] = 1
+            entry[i] = close[i]
+            position = 1
+        elif position == 0 and enter_short[i]:
+            signal[i] = -1
+            entry[i] = close[i]
+            position = -1
+        elif position == 1 and exit_long[i]:
+            signal[i] = 0
+            exit_[i] = close[i]
+            position = 0
+        elif position == -1 and exit_short[i]:
+            signal[i] = 0
+            exit_[i] = close[i]
+            position = 0
+        position_out[i] = position
+    return signal, position_out, entry, exit_
+
+
+def _backtest(price, signal, initial_capital, commission):
+    """롱 전용 체결 루프 -> (보유 수량, 현금, 봉별 포지션 보유 여부, 매매 위치, 매매 방향(1/-1), 매매 수량)"""
+    n = len(price)
+    holdings = np.zeros(n)
+    cash = np.zeros(n)
+    cash[0] = initial_capital
+    exposed = np.zeros(n, dtype=np.bool_)
+    trade_index = np.zeros(n, dtype=np.int64)
+    trade_side = np.zeros(n, dtype=np.int64)
+    trade_shares = np.zeros(n)
+    trades = 0
+    position = 0
+    for i in range(1, n):
+        if signal[i] == 1 and position == 0:
+            shares = cash[i - 1] // (price[i] * (1 + commission))
+            holdings[i] = shares
+            cash[i] = cash[i - 1] - shares * price[i] * (1 + commission)
+            position = 1
+            trade_index[trades] = i
+            trade_side[trades] = 1
+            trade_shares[trades] = shares
+            trades += 1
+        elif signal[i] == -1 and position == 1:
+            shares = holdings[i - 1]
+            holdings[i] = 0
+            cash[i] = cash[i - 1] + shares * price[i] * (1 - commission)
+            position = 0
+            trade_index[trades] = i
+            trade_side[trades] = -1
+            trade_shares[trades] = shares
+            trades += 1
+        else:
+            holdings[i] = holdings[i - 1]
+            cash[i] = cash[i - 1]
+        exposed[i] = position == 1
+    return holdings, cash, exposed, trade_index[:trades], trade_side[:trades], trade_shares[:trades]
+
+
+_KERNELS = {'numpy': (_rha_open, _trading_logic, _backtest)}
+
+
+def _kernels(backend):
+    """백엔드별 순차 루프 함수 (numba는 처음 사용할 때 컴파일)"""
+    if backend == 'numba' and backend not in _KERNELS:
+        try:
+            import numba
+        except ImportError:
+            logger.warning("numba가 설치되어 있지 않아 numpy 백엔드를 사용합니다")
+            _KERNELS['numba'] = _KERNELS['numpy']
+        else:
+            _KERNELS['numba'] = tuple(numba.njit(cache=True)(func)
+                                      for func in (_rha_open, _trading_logic, _backtest))
+    if backend not in _KERNELS:
+        raise ValueError(f"Unknown MRHA backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return _KERNELS[backend]
+
+
+def _rolling(values, window, func):
+    """pandas rolling(window).<func>()과 같은 정렬 (앞 window-1개와 NaN 포함 구간은 NaN)"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        out[window - 1:] = func(windows, axis=1)
+    return out
+
+
+def _shift(values, periods):
+    """pandas shift(periods) (periods >= 1)"""
+    out = np.full(len(values), np.nan)
+    out[periods:] = values[:-periods]
+    return out
+
+
+def _td_setup(condition):
+    """조건이 9봉 연속될 때마다 해당 9개 봉에 1..9 표시 (카운터는 9에서, 조건이 깨지면 0으로 초기화)"""
+    n = len(condition)
+    marks = np.zeros(n, dtype=np.int64)
+    # 조건이 연속된 구간 안에서의 순번 (1부터)
+    index = np.arange(n)
+    last_break = np.maximum.accumulate(np.where(condition, -1, index))
+    run = np.where(condition, index - last_break, 0)
+    for end in np.flatnonzero((run > 0) & (run % 9 == 0)):
+        marks[end - 8:end + 1] = np.arange(1, 10)
+    return marks
+
+
+def compute(stock_data, backend='numpy', initial_capital=100000000, commission=0.001,
+            periods_per_year=365):
+    """기준 구현과 같은 (mrha_data, backtest_results, trades, metrics) 계산"""
+    if stock_data.index.duplicated().any():
+        raise ValueError("Duplicate dates found in stock_data index. Please check the data.")
+    rha_open, trading_logic, backtest = _kernels(backend)
+
+    index = stock_data.index
+    open_ = stock_data['Open'].to_numpy(dtype=np.float64)
+    high = stock_data['High'].to_numpy(dtype=np.float64)
+    low = stock_data['Low'].to_numpy(dtype=np.float64)
+    close = stock_data['Close'].to_numpy(dtype=np.float64)
+
+    # Revised Heikin Ashi (h_high는 MRHA에 쓰이지 않으므로 생략)
+    h_close = (open_ + high + low + close) / 4
+    h_open = rha_open(open_, h_close)
+    h_low = np.fmin(np.fmin(h_open, h_close), low)
+
+    # MRHA: 기준 구현은 dropna 후 가격 목표와 재결합하므로, 하나라도 NaN인 행은 전부 NaN
+    mrha = np.empty((len(index), 4))
+    mrha[:, 0] = (h_open + h_close) / 2
+    mrha[:, 1] = _rolling(h_open, 5, np.mean)
+    mrha[:, 2] = _rolling(h_low, 5, np.mean)
+    mrha[:, 3] = (mrha[:, 0] + high + low + close * 2) / 5
+    invalid = np.isnan(mrha).any(axis=1)
+    mrha[invalid] = np.nan
+    mh_open, mh_high, mh_low, mh_close = mrha.T
+
+    ebr = np.where(invalid, np.nan, (4 * mh_open - low) / 3)
+    ebl = np.where(invalid, np.nan, (4 * mh_open - high) / 3)
+    btrg = 1.00618 * ebr
+    strg = 0.99382 * ebl
+
+    bullish_target = _rolling(low, 5, np.min) * 1.0618
+    bearish_target = _rolling(high, 5, np.max) * 0.9382
+
+    close_4_ago = _shift(mh_close, 4)
+    td_buy = _td_setup(mh_close < close_4_ago)
+    td_sell = _td_setup(mh_close > close_4_ago)
+
+    # 매매 조건 (NaN 비교는 False로 기준 구현과 동일)
+    bullish = (mh_close > mh_open) & (mh_close > _shift(mh_high, 1))
+    bearish = (mh_close < mh_open) & (mh_close < _shift(mh_low, 1))
+    signal, position, entry, exit_ = trading_logic(
+        mh_close,
+        bullish & (mh_close > btrg),
+        bearish & (mh_close < strg),
+        (mh_close < ebl) | (mh_close > bullish_target),
+        (mh_close > ebr) | (mh_close < bearish_target),
+    )
+
+    mrha_data = pd.DataFrame({
+        'mh_open': mh_open, 'mh_high': mh_high, 'mh_low': mh_low, 'mh_close': mh_close,
+        'Ebr': ebr, 'Btrg': btrg, 'Ebl': ebl, 'Strg': strg,
+        'Bullish_Target': bullish_target, 'Bearish_Target': bearish_target,
+        'Close_4_bars_ago': close_4_ago, 'TD_Buy_Setup': td_buy, 'TD_Sell_Setup': td_sell,
+        'Signal': signal, 'Position': position, 'Entry_Price': entry, 'Exit_Price': exit_,
+    }, index=index)
+
+    # 백테스트 (체결 가격은 mh_close)
+    holdings, cash, exposed, trade_index, trade_side, trade_shares = backtest(
+        mh_close, signal, float(initial_capital), commission)
+    total_value = holdings * mh_close + cash
+    total_value[0] = initial_capital
+    prev_value = _shift(total_value, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(prev_value != 0, total_value / prev_value - 1, 0.0)
+    returns[0] = 0
+    backtest_results = pd.DataFrame({'Holdings': holdings, 'Cash': cash, 'Total_Value': total_value,
+                                     'Returns': returns}, index=index)
+
+    trades = pd.DataFrame([{'Date': index[i], 'Type': 'Buy' if side == 1 else 'Sell',
+                            'Price': mh_close[i], 'Shares': shares}
+                           for i, side, shares in zip(trade_index, trade_side, trade_shares)])
+
+    metrics = OnlineMetrics(periods_per_year, DEFAULT_WINDOWS)
+    metrics.update(initial_capital)
+    for value, in_position in zip(total_value[1:].tolist(), exposed[1:].tolist()):
+        metrics.update(value, in_position)
+    metrics.record_trade(len(trade_index))
+    return mrha_data, backtest_results, trades, metrics
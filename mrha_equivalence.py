@@ -0,0 +1,160 @@
+"""MRHA 계산 백엔드 동등성 검사
+
+무작위 합성 OHLCV 시계열(길이/변동성/추세/횡보 구간을 섞음)마다 pandas 기준 구현과
+다른 백엔드(numpy, numba)의 결과를 비교합니다.
+  - mrha_data, backtest_results: 모든 컬럼을 NaN 위치까지 비교
+    (TD 셋업/Signal/Position은 정확히, 실수 컬럼은 상대 오차 rtol 이내)
+  - trades: 매매 건수, 날짜, 방향은 정확히, 가격/수량은 rtol 이내
+  - get_results: 모든 성과 지표 rtol 이내
+
+사용 예:
+    python mrha_equivalence.py --series 200 --seed 7
+    python mrha_equivalence.py --backend numba --min-bars 500 --max-bars 5000
+
+불일치가 있으면 컬럼별 첫 차이를 출력하고 종료 코드 1로 끝납니다.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from class_mrha import MRHATradingSystem
+
+EXACT_COLUMNS = ('TD_Buy_Setup', 'TD_Sell_Setup', 'Signal', 'Position')
+
+
+def synthetic_ohlcv(rng, bars, interval="day"):
+    """무작위 OHLCV (가격대, 추세, 변동성을 시계열마다 다르게 하고 일부 봉은 시가=고가=저가=종가)"""
+    price = 10 ** rng.uniform(0, 6)
+    drift = rng.normal(0, 0.002)
+    volatility = rng.uniform(0.002, 0.08)
+    close = price * np.exp(np.cumsum(rng.normal(drift, volatility, bars)))
+    open_ = np.r_[price, close[:-1]] * np.exp(rng.normal(0, volatility / 4, bars))
+    spread = np.abs(rng.normal(0, volatility, (2, bars)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+
+    # 거래가 없는 봉 (틱 변화 없음)
+    flat = rng.random(bars) < 0.02
+    open_[flat] = high[flat] = low[flat] = close[flat]
+
+    freq = {'day': 'D', 'minute60': 'h'}.get(interval, 'D')
+    index = pd.date_range('2020-01-01', periods=bars, freq=freq, name='Date')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close,
+                         'Volume': rng.uniform(1, 1000, bars)}, index=index)
+
+
+def _compare_frames(name, expected, actual, rtol):
+    """컬럼 단위 비교, 첫 불일치 설명 문자열 목록 반환"""
+    errors = []
+    if list(expected.columns) != list(actual.columns):
+        return [f"{name}: columns {list(expected.columns)} != {list(actual.columns)}"]
+    if not expected.index.equals(actual.index):
+        return [f"{name}: index differs ({len(expected)} vs {len(actual)} rows)"]
+    for column in expected.columns:
+        left = expected[column].to_numpy(dtype=np.float64)
+        right = actual[column].to_numpy(dtype=np.float64)
+        if column in EXACT_COLUMNS:
+            same = (left == right) | (np.isnan(left) & np.isnan(right))
+        else:
+            same = np.isclose(left, right, rtol=rtol, atol=0.0, equal_nan=True)
+        if not same.all():
+            row = int(np.flatnonzero(~same)[0])
+            errors.append(f"{name}.{column} @ {expected.index[row]}: {left[row]!r} != {right[row]!r}")
+    return errors
+
+
+def _compare_trades(expected, actual, rtol):
+    if len(expected) != len(actual):
+        return [f"trades: {len(expected)} != {len(actual)} rows"]
+    if len(expected) == 0:
+        return []
+    errors = []
+    for column in ('Date', 'Type'):
+        mismatch = np.flatnonzero(expected[column].to_numpy() != actual[column].to_numpy())
+        if len(mismatch):
+            row = mismatch[0]
+            errors.append(f"trades.{column}[{row}]: {expected[column].iloc[row]!r} != "
+                          f"{actual[column].iloc[row]!r}")
+    errors += _compare_frames('trades', expected[['Price', 'Shares']], actual[['Price', 'Shares']], rtol)
+    return errors
+
+
+def _compare_results(expected, actual, rtol):
+    errors = []
+    for key, value in expected.items():
+        other = actual.get(key)
+        if other is None or not np.isclose(value, other, rtol=rtol, atol=1e-12, equal_nan=True):
+            errors.append(f"results[{key!r}]: {value!r} != {other!r}")
+    return errors
+
+
+def _run(stock_data, backend, interval):
+    system = MRHATradingSystem("SYNTH", interval, len(stock_data), backend=backend)
+    system.stock_data = stock_data
+    started = time.perf_counter()
+    system.compute()
+    return system, time.perf_counter() - started
+
+
+def check_series(stock_data, backends, interval="day", rtol=1e-9):
+    """시계열 1개 검사 -> ({백엔드: 불일치 목록}, {백엔드: 소요 시간}, 기준 매매 건수)"""
+    reference, reference_seconds = _run(stock_data, 'pandas', interval)
+    errors = {}
+    seconds = {'pandas': reference_seconds}
+    for backend in backends:
+        system, seconds[backend] = _run(stock_data, backend, interval)
+        errors[backend] = (
+            _compare_frames('mrha_data', reference.mrha_data, system.mrha_data, rtol)
+            + _compare_frames('backtest_results', reference.backtest_results,
+                              system.backtest_results, rtol)
+            + _compare_trades(reference.trades, system.trades, rtol)
+            + _compare_results(reference.get_results(), system.get_results(), rtol)
+        )
+    return errors, seconds, len(reference.trades)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MRHA 계산 백엔드를 pandas 기준 구현과 비교")
+    parser.add_argument("--backend", action="append", dest="backends",
+                        help="비교할 백엔드 (여러 번 지정 가능, 기본 numpy와 numba)")
+    parser.add_argument("--series", type=int, default=50, help="무작위 시계열 개수")
+    parser.add_argument("--min-bars", type=int, default=10)
+    parser.add_argument("--max-bars", type=int, default=1500)
+    parser.add_argument("--interval", default="day")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    backends = args.backends or ['numpy', 'numba']
+    rng = np.random.default_rng(args.seed)
+    totals = dict.fromkeys(['pandas'] + backends, 0.0)
+    failed = dict.fromkeys(backends, 0)
+    trades = 0
+    for n in range(args.series):
+        stock_data = synthetic_ohlcv(rng, int(rng.integers(args.min_bars, args.max_bars + 1)),
+                                     args.interval)
+        errors, seconds, count = check_series(stock_data, backends, args.interval, args.rtol)
+        for backend, elapsed in seconds.items():
+            totals[backend] += elapsed
+        for backend, problems in errors.items():
+            if problems:
+                failed[backend] += 1
+                print(f"[{backend}] series {n} ({len(stock_data)} bars): {len(problems)}개 불일치")
+                for problem in problems[:5]:
+                    print(f"    {problem}")
+        trades += count
+
+    print(f"{args.series}개 시계열, 매매 {trades}건 비교")
+    for backend in backends:
+        status = "OK" if not failed[backend] else f"{failed[backend]}개 시계열 불일치"
+        speedup = totals['pandas'] / totals[backend] if totals[backend] > 0 else float('inf')
+        print(f"  {backend:6s}: {status}, {totals[backend]:.3f}초 (pandas {totals['pandas']:.3f}초, "
+              f"x{speedup:.1f})")
+    return 1 if any(failed.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
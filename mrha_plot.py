@@ -0,0 +1,208 @@
+"""MRHA 백테스트 결과 차트 (plotly 선택 의존성)
+
+plotly는 차트가 필요할 때만 로드되도록 이 모듈로 분리되어 있습니다.
+헤드리스 트레이더(realtime_trader.py)는 이 모듈을 import하지 않습니다.
+"""
+import numpy as np
+
+try:
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+except ImportError as e:
+    raise ImportError("차트 기능을 사용하려면 plotly가 필요합니다: pip install plotly") from e
+
+
+# 이 봉 수를 넘으면 자동으로 대용량 모드(decimation + WebGL)로 그립니다.
+LARGE_DATA_THRESHOLD = 5000
+# 대용량 모드에서 화면에 그릴 최대 캔들 수 (대략 차트 가로 픽셀 수)
+DEFAULT_MAX_POINTS = 1500
+
+
+def plot_results(system, large=None, max_points=DEFAULT_MAX_POINTS):
+    """MRHATradingSystem 분석 결과를 plotly Figure로 반환
+
+    large가 None이면 봉 수에 따라 자동 선택합니다. 대용량 모드는 캔들을
+    max_points개 구간으로 OHLC 보존 축약하고, WebGL 트레이스를 사용하며,
+    매매 표시를 하나의 마커 트레이스로 그려 HTML 크기를 일정하게 유지합니다.
+    """
+    if large is None:
+        large = len(system.mrha_data) > LARGE_DATA_THRESHOLD
+    if large:
+        return _plot_results_large(system, max_points)
+
+    fig = _make_figure()
+
+    fig.add_trace(go.Candlestick(x=system.mrha_data.index,
+                open=system.mrha_data['mh_open'],
+                high=system.mrha_data['mh_high'],
+                low=system.mrha_data['mh_low'],
+                close=system.mrha_data['mh_close'],
+                name='MRHA'), row=1, col=1)
+
+    # TD Buy Setup 텍스트 추가
+    buy_setup_text = system.mrha_data['TD_Buy_Setup'].replace(0, '').astype(str)
+    buy_setup_font = ['green' if x != '9' else 'darkgreen' for x in buy_setup_text]
+    buy_setup_size = [10 if x != '9' else 14 for x in buy_setup_text]
+
+    fig.add_trace(go.Scatter(
+        x=system.mrha_data.index,
+        y=system.mrha_data['mh_low'] - (system.mrha_data['mh_high'] - system.mrha_data['mh_low']) * 0.05,
+        text=buy_setup_text,
+        mode='text',
+        textposition='bottom center',
+        textfont=dict(color=buy_setup_font, size=buy_setup_size),
+        name='TD Buy Setup'
+    ), row=1, col=1)
+
+    # TD Sell Setup 텍스트 추가
+    sell_setup_text = system.mrha_data['TD_Sell_Setup'].replace(0, '').astype(str)
+    sell_setup_font = ['red' if x != '9' else 'darkred' for x in sell_setup_text]
+    sell_setup_size = [10 if x != '9' else 14 for x in sell_setup_text]
+
+    fig.add_trace(go.Scatter(
+        x=system.mrha_data.index,
+        y=system.mrha_data['mh_high'] + (system.mrha_data['mh_high'] - system.mrha_data['mh_low']) * 0.1,
+        text=sell_setup_text,
+        mode='text',
+        textposition='top center',
+        textfont=dict(color=sell_setup_font, size=sell_setup_size),
+        name='TD Sell Setup'
+    ), row=1, col=1)
+
+    for _, trade in system.trades.iterrows():
+        if trade['Type'] == 'Buy':
+            fig.add_annotation(x=trade['Date'], y=system.mrha_data.loc[trade['Date'], 'mh_low'],
+                           text="Buy", showarrow=True, arrowhead=1, arrowcolor="green", arrowsize=1.5,
+                           arrowwidth=2, ax=0, ay=40, row=1, col=1)
+        elif trade['Type'] == 'Sell':
+            fig.add_annotation(x=trade['Date'], y=system.mrha_data.loc[trade['Date'], 'mh_high'],
+                           text="Sell", showarrow=True, arrowhead=1, arrowcolor="red", arrowsize=1.5,
+                           arrowwidth=2, ax=0, ay=-40, row=1, col=1)
+
+    fig.add_trace(go.Scatter(x=system.backtest_results.index, y=system.backtest_results['Total_Value'],
+                         mode='lines', name='Portfolio Value'), row=2, col=1)
+
+    fig.add_trace(go.Histogram(x=system.backtest_results['Returns'].dropna(), 
+                           name='Daily Returns', nbinsx=50), row=3, col=1)
+
+    _finish_layout(fig, system)
+    return fig
+
+
+def _make_figure():
+    return make_subplots(rows=3, cols=2, shared_xaxes=True, 
+                    vertical_spacing=0.05, horizontal_spacing=0.05,
+                    subplot_titles=('MRHA Chart with TD Setup', 'Backtest Results', 'Portfolio Value', '', 'Daily Returns Distribution', ''),
+                    row_heights=[0.5, 0.3, 0.2], column_widths=[0.7, 0.3])
+
+
+def _finish_layout(fig, system):
+    """결과 요약 주석과 공통 레이아웃 적용"""
+    results = system.get_results()
+    results_text = '<br>'.join([f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}" for key, value in results.items()])
+    fig.add_annotation(text=results_text, align='left', showarrow=False, xref='paper', yref='paper', x=1.02, y=0.95, row=1, col=2)
+
+    fig.update_layout(height=1200, width=1600, title_text=f"MRHA Trading System Results with TD Setup - {system.symbol}")
+    fig.update_xaxes(rangeslider_visible=False, row=1, col=1)
+    fig.update_yaxes(title_text="Price", row=1, col=1)
+    fig.update_yaxes(title_text="Portfolio Value ($)", row=2, col=1)
+    fig.update_xaxes(title_text="Daily Return", row=3, col=1)
+    fig.update_yaxes(title_text="Frequency", row=3, col=1)
+
+
+def decimate_ohlc(index, open_, high, low, close, max_points):
+    """OHLC를 최대 max_points개 구간으로 축약 (구간 첫 시가/최고가/최저가/마지막 종가 보존)"""
+    n = len(open_)
+    if n <= max_points:
+        return index, open_, high, low, close
+    starts = np.linspace(0, n, max_points, endpoint=False).astype(np.int64)
+    ends = np.r_[starts[1:], n]
+    return (index[starts],
+            open_[starts],
+            np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts),
+            close[ends - 1])
+
+
+def decimate_line(index, values, max_points):
+    """선 그래프를 구간별 최소/최대값으로 축약 (고점/저점 보존)"""
+    n = len(values)
+    if n <= max_points:
+        return index, values
+    buckets = max(max_points // 2, 1)
+    starts = np.linspace(0, n, buckets, endpoint=False).astype(np.int64)
+    ends = np.r_[starts[1:], n]
+    positions = np.empty(buckets * 2, dtype=np.int64)
+    for k, (s, e) in enumerate(zip(starts, ends)):
+        chunk = values[s:e]
+        lo, hi = s + int(np.nanargmin(chunk)), s + int(np.nanargmax(chunk))
+        positions[2 * k], positions[2 * k + 1] = min(lo, hi), max(lo, hi)
+    return index[positions], values[positions]
+
+
+def _thin(mask, max_points):
+    """불리언 마스크의 True 위치를 최대 max_points개로 균등 추출"""
+    positions = np.flatnonzero(mask)
+    if len(positions) > max_points:
+        positions = positions[np.linspace(0, len(positions) - 1, max_points).astype(np.int64)]
+    return positions
+
+
+def _plot_results_large(system, max_points):
+    """대용량 백테스트용 차트 (축약 캔들 + WebGL)"""
+    fig = _make_figure()
+    data = system.mrha_data
+    index = data.index.values
+
+    x, o, h, l, c = decimate_ohlc(
+        index,
+        data['mh_open'].to_numpy(dtype=float),
+        data['mh_high'].to_numpy(dtype=float),
+        data['mh_low'].to_numpy(dtype=float),
+        data['mh_close'].to_numpy(dtype=float),
+        max_points,
+    )
+    fig.add_trace(go.Candlestick(x=x, open=o, high=h, low=l, close=c, name='MRHA'), row=1, col=1)
+
+    # TD Setup은 완성된 9 카운트만 마커로 표시 (max_points개 초과 시 균등 추출)
+    buy_9 = _thin(data['TD_Buy_Setup'].to_numpy() == 9, max_points)
+    sell_9 = _thin(data['TD_Sell_Setup'].to_numpy() == 9, max_points)
+    fig.add_trace(go.Scattergl(
+        x=index[buy_9], y=data['mh_low'].to_numpy(dtype=float)[buy_9],
+        mode='markers', marker=dict(symbol='circle-open', color='darkgreen', size=6),
+        name='TD Buy 9'
+    ), row=1, col=1)
+    fig.add_trace(go.Scattergl(
+        x=index[sell_9], y=data['mh_high'].to_numpy(dtype=float)[sell_9],
+        mode='markers', marker=dict(symbol='circle-open', color='darkred', size=6),
+        name='TD Sell 9'
+    ), row=1, col=1)
+
+    # 매매는 하나의 마커 트레이스로 표시
+    if system.trades is not None and len(system.trades) > 0:
+        is_buy = (system.trades['Type'] == 'Buy').to_numpy()
+        dates = system.trades['Date']
+        y = np.where(is_buy,
+                     data['mh_low'].reindex(dates).to_numpy(dtype=float),
+                     data['mh_high'].reindex(dates).to_numpy(dtype=float))
+        fig.add_trace(go.Scattergl(
+            x=dates.values, y=y, mode='markers',
+            marker=dict(symbol=np.where(is_buy, 'triangle-up', 'triangle-down'),
+                        color=np.where(is_buy, 'green', 'red'), size=9),
+            text=system.trades['Type'].values,
+            name='Trades'
+        ), row=1, col=1)
+
+    values = system.backtest_results['Total_Value'].to_numpy(dtype=float)
+    px, py = decimate_line(system.backtest_results.index.values, values, max_points)
+    fig.add_trace(go.Scattergl(x=px, y=py, mode='lines', name='Portfolio Value'), row=2, col=1)
+
+    # 수익률 분포는 미리 집계한 막대로 그려 원본 데이터를 HTML에 넣지 않음
+    returns = system.backtest_results['Returns'].to_numpy(dtype=float)
+    returns = returns[~np.isnan(returns)]
+    counts, edges = np.histogram(returns, bins=50)
+    fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                         name='Daily Returns'), row=3, col=1)
+
+    _finish_layout(fig, system)
+    return fig
@@ -3,12 +3,15 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime
 import time
+import logging
 from slack_notifier import SlackNotifier
 from notion_client.errors import APIResponseError
 
 # .env 파일 로드
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class NotionManager:
     def __init__(self):
         # 환경 변수 로드 확인
@@ -16,10 +19,9 @@ class NotionManager:
         daily_signals_db_id = os.getenv('DAILY_SIGNALS_DB_ID')
         portfolio_db_id = os.getenv('PORTFOLIO_DB_ID')
         
-        print(f"Environment variables loaded:")
-        print(f"NOTION_TOKEN: {'Set' if notion_token else 'Not set'}")
-        print(f"DAILY_SIGNALS_DB_ID: {'Set' if daily_signals_db_id else 'Not set'}")
-        print(f"PORTFOLIO_DB_ID: {'Set' if portfolio_db_id else 'Not set'}")
+        logger.debug("NOTION_TOKEN: %s", 'Set' if notion_token else 'Not set')
+        logger.debug("DAILY_SIGNALS_DB_ID: %s", 'Set' if daily_signals_db_id else 'Not set')
+        logger.debug("PORTFOLIO_DB_ID: %s", 'Set' if portfolio_db_id else 'Not set')
         
         if not all([notion_token, daily_signals_db_id, portfolio_db_id]):
             raise ValueError("Required environment variables are not set")
@@ -32,76 +34,23 @@ class NotionManager:
     def update_daily_signals(self, signals_data):
         """00:00 작업 - Daily Signals DB 업데이트"""
         try:
-            print(f"\n=== Daily Signals DB 업데이트 시작 ===")
-            print(f"데이터베이스 ID: {self.daily_signals_db_id}")
-            print(f"시그널 데이터 수: {len(signals_data)}")
+            logger.info("Daily Signals DB 업데이트 시작")
+            logger.debug("데이터베이스 ID: %s", self.daily_signals_db_id)
+            logger.info("시그널 데이터 수: %d", len(signals_data))
             
             # 기존 데이터 삭제
-            print("기존 데이터 삭제 시도...")
+            logger.debug("기존 데이터 삭제 시도...")
             self._clear_signals_db()
-            print("기존 데이터 삭제 완료")
+            logger.debug("기존 데이터 삭제 완료")
             
             # 새로운 시그널 데이터 추가
             for signal in signals_data:
-                print(f"\n시그널 추가 시도: {signal['ticker']}")
+                logger.debug("시그널 추가 시도: %s", signal['ticker'])
                 try:
-                    self.notion.pages.create(
-                        parent={"database_id": self.daily_signals_db_id},
-                        properties={
-                            "Record ID": {
-                                "title": [{
-                                    "text": {
-                                        "content": f"{datetime.now().strftime('%Y%m%d')}-{signal['ticker']}"
-                                    }
-                                }]
-                            },
-                            "Date": {
-                                "date": {
-                                    "start": datetime.now().strftime('%Y-%m-%d')
-                                }
-                            },
-                            "Ticker": {
-                                "select": {
-                                    "name": signal['ticker']
-                                }
-                            },
-                            "Rank": {
-                                "number": signal['rank']
-                            },
-                            "Trading_Value": {
-                                "number": signal['trading_value']
-                            },
-                            "Signal": {
-                                "select": {
-                                    "name": signal['signal']
-                                }
-                            },
-                            "Status": {
-                                "select": {
-                                    "name": "PENDING"
-                                }
-                            },
-                            "Execution_time": {
-                                "date": {
-                                    "start": datetime.now().strftime('%Y-%m-%d')
-                                }
-                            },
-                            "Error_Message": {
-                                "rich_text": [{
-                                    "text": {
-                                        "content": ""
-                                    }
-                                }]
-                            },
-                            "Retry_Count": {
-                                "number": 0
-                            }
-                        }
-                    )
-                    print(f"{signal['ticker']} 시그널 추가 성공")
-                    time.sleep(0.5) # API 요청 간 지연 추가
+                    self.add_daily_signal(signal)
+                    logger.debug("%s 시그널 추가 성공", signal['ticker'])
                 except Exception as e:
-                    print(f"{signal['ticker']} 시그널 추가 실패: {e}")
+                    logger.error("%s 시그널 추가 실패: %s", signal['ticker'], e)
                     raise
             
             # 시그널 생성 알림
@@ -114,21 +63,85 @@ SELL 시그널: {len([s for s in signals_data if s['signal'] == 'SELL'])}
 HOLD 시그널: {len([s for s in signals_data if s['signal'] == 'HOLD'])}
 """)
             
-            print("\n=== Daily Signals DB 업데이트 완료 ===")
+            logger.info("Daily Signals DB 업데이트 완료")
             return True
         except Exception as e:
             error_msg = f"Error updating signals: {e}"
-            print(f"\n에러 발생: {error_msg}")
+            logger.error("에러 발생: %s", error_msg)
             self.slack.notify_error("시그널 업데이트 실패", error_msg)
             return False
 
+    def clear_daily_signals(self):
+        """Daily Signals DB 기존 데이터 삭제 (스트리밍 게시 시작 전 호출)"""
+        return self._clear_signals_db()
+
+    def add_daily_signal(self, signal):
+        """시그널 1개를 Daily Signals DB에 추가하고 페이지 ID 반환"""
+        page = self.notion.pages.create(
+            parent={"database_id": self.daily_signals_db_id},
+            properties={
+                "Record ID": {
+                    "title": [{
+                        "text": {
+                            "content": f"{datetime.now().strftime('%Y%m%d')}-{signal['ticker']}"
+                        }
+                    }]
+                },
+                "Date": {
+                    "date": {
+                        "start": datetime.now().strftime('%Y-%m-%d')
+                    }
+                },
+                "Ticker": {
+                    "select": {
+                        "name": signal['ticker']
+                    }
+                },
+                "Rank": {
+                    "number": signal['rank']
+                },
+                "Trading_Value": {
+                    "number": signal['trading_value']
+                },
+                "Signal": {
+                    "select": {
+                        "name": signal['signal']
+                    }
+                },
+                "Status": {
+                    "select": {
+                        "name": "PENDING"
+                    }
+                },
+                "Execution_time": {
+                    "date": {
+                        "start": datetime.now().strftime('%Y-%m-%d')
+                    }
+                },
+                "Error_Message": {
+                    "rich_text": [{
+                        "text": {
+                            "content": ""
+                        }
+                    }]
+                },
+                "Retry_Count": {
+                    "number": 0
+                }
+            }
+        )
+        # 로컬 원장과 연결할 수 있도록 생성된 페이지 ID 기록
+        signal['notion_page_id'] = page['id']
+        time.sleep(0.5) # API 요청 간 지연 추가
+        return page['id']
+
     def update_portfolio(self, portfolio_data):
         """포트폴리오 DB 업데이트"""
         try:
-            print("\n=== 포트폴리오 DB 업데이트 시작 ===")
+            logger.info("포트폴리오 DB 업데이트 시작")
             
             # 기존 데이터 삭제
-            print("기존 포트폴리오 데이터 삭제 시도...")
+            logger.debug("기존 포트폴리오 데이터 삭제 시도...")
             results = self.notion.databases.query(
                 database_id=self.portfolio_db_id
             )
@@ -138,7 +151,7 @@ HOLD 시그널: {len([s for s in signals_data if s['signal'] == 'HOLD'])}
                     archived=True
                 )
                 time.sleep(0.5) # API 요청 간 지연 추가
-            print("기존 포트폴리오 데이터 삭제 완료")
+            logger.debug("기존 포트폴리오 데이터 삭제 완료")
             
             # 새로운 포트폴리오 데이터 추가
             for position in portfolio_data:
@@ -177,17 +190,17 @@ HOLD 시그널: {len([s for s in signals_data if s['signal'] == 'HOLD'])}
                             }
                         }
                     )
-                    print(f"{position['ticker']} 포지션 추가 성공")
+                    logger.debug("%s 포지션 추가 성공", position['ticker'])
                     time.sleep(0.5) # API 요청 간 지연 추가
                 except APIResponseError as e_create: # API 에러를 특정해서 잡습니다.
                     error_msg_create = f"{position['ticker']} 포지션 추가 실패 (Notion API Error): {e_create.status} - {e_create.code} - {e_create.body}"
-                    print(error_msg_create)
+                    logger.error(error_msg_create)
                     # 여기서 전체 업데이트를 중단할지, 아니면 다음 포지션으로 넘어갈지 결정할 수 있습니다.
                     # 일단은 에러를 전파하여 전체 업데이트가 실패하도록 합니다.
                     raise # API 에러를 다시 발생시켜 바깥의 except 블록에서 잡도록 함
                 except Exception as e_create:
                     error_msg_create = f"{position['ticker']} 포지션 추가 실패 (General Error): {type(e_create).__name__} - {str(e_create)}"
-                    print(error_msg_create)
+                    logger.error(error_msg_create)
                     raise # 일반 에러를 다시 발생시켜 바깥의 except 블록에서 잡도록 함
             
             # 포트폴리오 업데이트 알림
@@ -198,16 +211,16 @@ HOLD 시그널: {len([s for s in signals_data if s['signal'] == 'HOLD'])}
 보유 코인 수: {len(portfolio_data) - 1}  # KRW 제외
 """)
             
-            print("=== 포트폴리오 DB 업데이트 완료 ===")
+            logger.info("포트폴리오 DB 업데이트 완료")
             return True
         except APIResponseError as e: # 전체 업데이트 과정에서의 API 에러
             error_msg = f"Error updating portfolio (Notion API Error): {e.status} - {e.code} - {e.body}"
-            print(error_msg)
+            logger.error(error_msg)
             self.slack.notify_error("포트폴리오 업데이트 실패 (API)", error_msg)
             return False
         except Exception as e: # 전체 업데이트 과정에서의 일반 에러
             error_msg = f"Error updating portfolio (General Error): {type(e).__name__} - {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             self.slack.notify_error("포트폴리오 업데이트 실패 (일반)", error_msg)
             return False
 
@@ -233,7 +246,7 @@ HOLD 시그널: {len([s for s in signals_data if s['signal'] == 'HOLD'])}
             return True
         except Exception as e:
             error_msg = f"Error updating signal status: {e}"
-            print(error_msg)
+            logger.error(error_msg)
             self.slack.notify_error("시그널 상태 업데이트 실패", error_msg)
             return False
 
@@ -252,12 +265,12 @@ HOLD 시그널: {len([s for s in signals_data if s['signal'] == 'HOLD'])}
             return True
         except APIResponseError as e:
             error_msg = f"Error clearing signals DB (Notion API Error): {e.status} - {e.code} - {e.body}"
-            print(error_msg)
+            logger.error(error_msg)
             self.slack.notify_error("시그널 DB 초기화 실패 (API)", error_msg)
             return False
         except Exception as e:
             error_msg = f"Error clearing signals DB (General Error): {type(e).__name__} - {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             self.slack.notify_error("시그널 DB 초기화 실패 (일반)", error_msg)
             return False
 
@@ -0,0 +1,175 @@
+"""봉 단위 온라인 성과 지표 누적기
+
+백테스트 루프나 실거래 체결/평가 시점마다 update(자산가치)를 호출하면, 이력을
+다시 훑지 않고 O(1)로 지표를 갱신합니다.
+  - 수익률 평균/분산: Welford 알고리즘
+  - 하방편차(Sortino): 음수 수익률 제곱합
+  - 최대낙폭/Calmar: 누적 고점 대비
+  - 노출도: 포지션 보유 봉 비율
+  - 롤링 윈도우(windows=(30, ...)): 최근 N봉 수익률/샤프/소르티노/윈도우 고점 대비 낙폭
+    (합계·제곱합을 증분 갱신하고, 윈도우 고점은 단조 큐로 유지)
+
+연율화는 암호화폐가 365일 거래되므로 periods_per_year(interval)로 인터벌별
+연간 봉 수를 사용합니다 (일봉 365, 60분봉 8760 등).
+"""
+import math
+from collections import deque
+from datetime import timedelta
+
+from historical_loader import interval_to_timedelta, normalize_interval
+
+DAYS_PER_YEAR = 365
+DEFAULT_WINDOWS = (30,)  # get_results에 포함할 롤링 윈도우 (봉 수)
+
+
+def periods_per_year(interval="day"):
+    """인터벌별 연간 봉 수 (24시간 365일 거래 기준, pyupbit 복수형 별칭 minutes60/days/weeks 포함)"""
+    interval = normalize_interval(interval)
+    if interval == 'month':
+        return 12
+    return timedelta(days=DAYS_PER_YEAR) / interval_to_timedelta(interval)
+
+
+class _RollingWindow:
+    """최근 size개 수익률의 합/제곱합/하방 제곱합과 자산가치 고점"""
+
+    def __init__(self, size):
+        self.size = size
+        self.returns = deque()
+        self.values = deque()  # 윈도우 시작 자산가치 포함 size+1개
+        self.peaks = deque()  # (봉 번호, 자산가치) 단조 감소 큐
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.downside_sq = 0.0
+
+    def update(self, index, value, ret):
+        self.values.append(value)
+        while self.peaks and self.peaks[-1][1] <= value:
+            self.peaks.pop()
+        self.peaks.append((index, value))
+        if ret is not None:
+            self.returns.append(ret)
+            self.total += ret
+            self.total_sq += ret * ret
+            self.downside_sq += min(ret, 0.0) ** 2
+            if len(self.returns) > self.size:
+                old = self.returns.popleft()
+                self.total -= old
+                self.total_sq -= old * old
+                self.downside_sq -= min(old, 0.0) ** 2
+        if len(self.values) > self.size + 1:
+            self.values.popleft()
+        while self.peaks[0][0] <= index - len(self.values):
+            self.peaks.popleft()
+
+    def results(self, periods):
+        n = len(self.returns)
+        if n == 0:
+            return {'Return': 0.0, 'Sharpe Ratio': 0.0, 'Sortino Ratio': 0.0, 'Drawdown': 0.0}
+        mean = self.total / n
+        variance = max(self.total_sq - n * mean * mean, 0.0) / (n - 1) if n > 1 else 0.0
+        downside = math.sqrt(max(self.downside_sq, 0.0) / n)
+        return {
+            'Return': self.values[-1] / self.values[0] - 1 if self.values[0] else 0.0,
+            'Sharpe Ratio': math.sqrt(periods) * mean / math.sqrt(variance) if variance > 0 else 0.0,
+            'Sortino Ratio': math.sqrt(periods) * mean / downside if downside > 0 else 0.0,
+            'Drawdown': self.values[-1] / self.peaks[0][1] - 1 if self.peaks[0][1] else 0.0,
+        }
+
+
+class OnlineMetrics:
+    """자산가치 스트림의 성과 지표 (update당 O(1))"""
+
+    def __init__(self, periods_per_year=DAYS_PER_YEAR, windows=()):
+        self.periods_per_year = periods_per_year
+        self.windows = {size: _RollingWindow(size) for size in windows}
+        self.bars = 0
+        self.exposed_bars = 0
+        self.trades = 0
+        self.initial_value = None
+        self.last_value = None
+        self.peak = None
+        self.max_drawdown = 0.0
+        # Welford
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+
+    def update(self, value, exposed=False):
+        """봉 1개의 자산가치 반영 (exposed: 해당 봉에 포지션 보유 여부, NaN인 봉은 건너뜀)"""
+        value = float(value)
+        if math.isnan(value):
+            return None
+        ret = None
+        if self.last_value is None:
+            self.initial_value = value
+            self.peak = value
+        else:
+            ret = value / self.last_value - 1 if self.last_value else 0.0
+            self.count += 1
+            delta = ret - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (ret - self.mean)
+            self.downside_sq += min(ret, 0.0) ** 2
+
+        if value > self.peak:
+            self.peak = value
+        elif self.peak:
+            self.max_drawdown = min(self.max_drawdown, value / self.peak - 1)
+
+        for window in self.windows.values():
+            window.update(self.bars, value, ret)
+        self.bars += 1
+        self.exposed_bars += bool(exposed)
+        self.last_value = value
+        return ret
+
+    def record_trade(self, count=1):
+        self.trades += count
+
+    def total_return(self):
+        if not self.initial_value:
+            return 0.0
+        return self.last_value / self.initial_value - 1
+
+    def annualized_return(self):
+        if self.bars == 0 or self.total_return() <= -1:
+            return -1.0 if self.bars else 0.0
+        return (1 + self.total_return()) ** (self.periods_per_year / self.bars) - 1
+
+    def volatility(self):
+        """수익률 표본 표준편차 (봉 단위)"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def sharpe_ratio(self):
+        std = self.volatility()
+        return math.sqrt(self.periods_per_year) * self.mean / std if std > 0 else 0.0
+
+    def sortino_ratio(self):
+        downside = math.sqrt(self.downside_sq / self.count) if self.count else 0.0
+        return math.sqrt(self.periods_per_year) * self.mean / downside if downside > 0 else 0.0
+
+    def calmar_ratio(self):
+        return self.annualized_return() / -self.max_drawdown if self.max_drawdown < 0 else 0.0
+
+    def exposure(self):
+        return self.exposed_bars / self.bars if self.bars else 0.0
+
+    def results(self):
+        """get_results 키에 Sortino/Calmar/노출도와 'Rolling <N> <지표>' 롤링 지표를 더한 dict"""
+        results = {
+            "Final Portfolio Value": self.last_value,
+            "Total Return": self.total_return(),
+            "Annualized Return": self.annualized_return(),
+            "Sharpe Ratio": self.sharpe_ratio(),
+            "Sortino Ratio": self.sortino_ratio(),
+            "Max Drawdown": self.max_drawdown,
+            "Calmar Ratio": self.calmar_ratio(),
+            "Exposure": self.exposure(),
+            "Total Trades": self.trades,
+        }
+        for size, window in self.windows.items():
+            for name, value in window.results(self.periods_per_year).items():
+                results[f"Rolling {size} {name}"] = value
+        return results
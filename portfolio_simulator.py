@@ -0,0 +1,173 @@
+"""실거래 일일 프로세스의 포트폴리오 단위 과거 시뮬레이션
+
+realtime_trader.run_trading_system이 매일 수행하는 과정을 그대로 재현합니다.
+  1. 거래대금 상위 N개 + 보유 코인으로 유니버스 구성
+  2. 각 코인의 전일 MRHA 매매(Buy/Sell)를 BUY/SELL 시그널로 변환
+  3. SELL 먼저 실행 (보유 수량 전량 매도)
+  4. BUY 실행 (KRW 잔고 확인 후 코인당 고정 금액 시장가 매수, 순위 순)
+  5. 수수료 반영 후 당일 종가로 평가
+
+심볼별 MRHA 계산은 BarStore 워커 프로세스에서 한 번만 수행하고, 일별 의사결정은
+(날짜 x 심볼) 배열에 대해 심볼 축으로 벡터화되어 있어 수년치도 수 초 안에 끝납니다.
+
+실거래와의 차이:
+  - 거래대금 순위는 09:01 시점의 당일 캔들 대신 전일 완성 캔들의 Value를 사용
+  - 체결가는 당일 캔들 시가(09:05 시장가 체결 근사)
+  - 전일 매매는 365일 창 대신 전체 히스토리로 한 번 계산한 MRHA 백테스트에서 가져옴
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore, map_symbols
+from class_mrha import MRHATradingSystem, summarize_performance
+from performance_metrics import DEFAULT_WINDOWS, OnlineMetrics, periods_per_year
+
+logger = logging.getLogger(__name__)
+
+
+def symbol_trade_signals(store, symbol, interval="day", start=None, end=None):
+    """한 심볼의 MRHA 백테스트 매매를 날짜별 시그널(+1 BUY, -1 SELL)로 반환"""
+    try:
+        bot = MRHATradingSystem(symbol, interval, None, bar_store=store, start=start, end=end)
+        bot.run_analysis()
+        if bot.trades is None or bot.trades.empty:
+            return symbol, pd.Series(dtype=np.int8)
+        values = np.where(bot.trades['Type'] == 'Buy', 1, -1).astype(np.int8)
+        return symbol, pd.Series(values, index=pd.DatetimeIndex(bot.trades['Date']))
+    except Exception as e:
+        logger.error("Error computing signals for %s: %s", symbol, e)
+        return symbol, pd.Series(dtype=np.int8)
+
+
+class PortfolioSimulator:
+    """실거래 일일 프로세스 재현 시뮬레이터"""
+
+    def __init__(self, store_root="data", symbols=None, start=None, end=None,
+                 initial_capital=10000000, order_krw=1000000, top_n=10,
+                 commission=0.0005, processes=None):
+        self.store_root = store_root
+        self.store = BarStore(store_root)
+        self.symbols = symbols if symbols is not None else self.store.symbols("day")
+        self.start = start
+        self.end = end
+        self.initial_capital = initial_capital
+        self.order_krw = order_krw
+        self.top_n = top_n
+        self.commission = commission
+        self.processes = processes
+        self.backtest_results = None
+        self.trades = None
+        self.metrics = None
+
+    def _load_matrices(self):
+        """심볼별 일봉을 (날짜 x 심볼) 배열로 정렬"""
+        frames = {}
+        for symbol in self.symbols:
+            df = self.store.get_frame(symbol, "day", start=self.start, end=self.end,
+                                      columns=['Open', 'Close', 'Value'])
+            if len(df):
+                frames[symbol] = df
+        if not frames:
+            raise ValueError(f"No daily bars in {self.store_root} for {len(self.symbols)} symbol(s) "
+                             f"between {self.start} and {self.end}")
+        self.symbols = list(frames)
+        dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values()))), name='Date')
+
+        def pivot(col):
+            return np.column_stack([frames[s][col].reindex(dates).to_numpy(dtype=float)
+                                    for s in self.symbols])
+
+        return dates, pivot('Open'), pivot('Close'), pivot('Value')
+
+    def _load_signals(self, dates):
+        """심볼별 MRHA 매매를 워커 프로세스에서 계산해 (날짜 x 심볼) 시그널 배열로 변환"""
+        results = map_symbols(self.store_root, symbol_trade_signals, self.symbols, self.processes,
+                              start=self.start, end=self.end)
+        signals = np.zeros((len(dates), len(self.symbols)), dtype=np.int8)
+        column = {s: j for j, s in enumerate(self.symbols)}
+        for symbol, series in results:
+            if len(series):
+                rows = dates.get_indexer(series.index)
+                valid = rows >= 0
+                signals[rows[valid], column[symbol]] = series.to_numpy()[valid]
+        return signals
+
+    def run(self):
+        dates, open_, close, value = self._load_matrices()
+        signals = self._load_signals(dates)
+        n_days, n_symbols = open_.shape
+
+        cash = float(self.initial_capital)
+        holdings = np.zeros(n_symbols)
+        last_close = np.zeros(n_symbols)
+        buy_cost = self.order_krw * (1 + self.commission)
+
+        total_values = np.empty(n_days)
+        cash_history = np.empty(n_days)
+        trades = []
+        metrics = OnlineMetrics(periods_per_year("day"), DEFAULT_WINDOWS)
+
+        for d in range(n_days):
+            # 전일 데이터 기준 (첫날은 의사결정 없음)
+            if d > 0:
+                prev_value = np.nan_to_num(value[d - 1], nan=-1.0)
+                tradable = ~np.isnan(open_[d])
+
+                # 1. 유니버스: 거래대금 상위 N + 보유 코인
+                order = np.argsort(-prev_value, kind='stable')
+                order = order[prev_value[order] >= 0]
+                universe = np.zeros(n_symbols, dtype=bool)
+                universe[order[:self.top_n]] = True
+                universe |= holdings > 0
+                universe &= tradable
+
+                # 2. 전일 매매 -> 시그널
+                day_signal = signals[d - 1]
+
+                # 3. SELL: 보유 수량 전량 시장가 매도
+                sell = universe & (day_signal == -1) & (holdings > 0)
+                if sell.any():
+                    revenue = holdings[sell] * open_[d, sell] * (1 - self.commission)
+                    cash += revenue.sum()
+                    for j, shares in zip(np.flatnonzero(sell), holdings[sell]):
+                        trades.append({'Date': dates[d], 'Ticker': self.symbols[j], 'Type': 'Sell',
+                                       'Price': open_[d, j], 'Shares': shares})
+                    holdings[sell] = 0
+
+                # 4. BUY: 순위 순으로, KRW 잔고가 남는 만큼 고정 금액 매수
+                buy = universe & (day_signal == 1)
+                if buy.any() and cash >= self.order_krw:
+                    rank = np.full(n_symbols, len(order), dtype=np.int64)
+                    rank[order] = np.arange(len(order))
+                    candidates = np.flatnonzero(buy)
+                    candidates = candidates[np.argsort(rank[candidates], kind='stable')]
+                    affordable = int((cash - self.order_krw) // buy_cost) + 1
+                    executed = candidates[:affordable]
+                    shares = self.order_krw / open_[d, executed]
+                    holdings[executed] += shares
+                    cash -= buy_cost * len(executed)
+                    for j, qty in zip(executed, shares):
+                        trades.append({'Date': dates[d], 'Ticker': self.symbols[j], 'Type': 'Buy',
+                                       'Price': open_[d, j], 'Shares': qty})
+
+            # 5. 당일 종가 평가 (가격이 없으면 마지막 종가 유지)
+            last_close = np.where(np.isnan(close[d]), last_close, close[d])
+            cash_history[d] = cash
+            total_values[d] = cash + (holdings * last_close).sum()
+            metrics.update(total_values[d], exposed=(holdings > 0).any())
+
+        portfolio = pd.DataFrame({'Cash': cash_history, 'Total_Value': total_values}, index=dates)
+        portfolio['Holdings_Value'] = portfolio['Total_Value'] - portfolio['Cash']
+        portfolio['Returns'] = portfolio['Total_Value'].pct_change().fillna(0)
+        self.backtest_results = portfolio
+        self.trades = pd.DataFrame(trades, columns=['Date', 'Ticker', 'Type', 'Price', 'Shares'])
+        metrics.record_trade(len(self.trades))
+        self.metrics = metrics
+        return self.backtest_results
+
+    def get_results(self):
+        if self.metrics is not None:
+            return self.metrics.results()
+        return summarize_performance(self.backtest_results, len(self.trades))
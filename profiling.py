@@ -0,0 +1,261 @@
+"""단계별 CPU/메모리 프로파일링 (필요할 때만 켜는 진단 모드)
+
+MRHA_PROFILE 환경 변수(또는 realtime_trader --profile)로 켜면 run_trading_system이
+실행마다 start_profile()로 프로파일러를 활성화하고, 각 단계가 stage(name)으로
+구간을 표시합니다. 프로파일러가 없으면 stage()는 아무 일도 하지 않습니다.
+
+  - MRHA_PROFILE: 1/cpu(cProfile만), memory(tracemalloc만), all(CPU+메모리), 0/off/미설정(끔)
+    all은 tracemalloc이 모든 할당을 추적하는 비용까지 cProfile 시간에 들어가 소요 시간이
+    크게 부풀려지므로(시뮬레이터 기준 약 17배), 느린 단계를 찾을 때는 cpu를 쓰고
+    all은 할당 위치를 함께 볼 때만 씁니다.
+  - 단계: portfolio, universe, signals, execution, verify (run_trading_system),
+          fetch, compute (run_analysis, 티커별 호출은 단계 이름별로 합산)
+  - CPU: 단계마다 cProfile을 켜고, 안쪽 단계에 들어가면 바깥 단계는 잠시 멈추므로
+    각 .prof에는 하위 단계를 뺀 시간만 남습니다.
+  - 메모리: 단계 시작/끝 tracemalloc 스냅샷 차이를 할당 위치(파일:줄)별로 합산 (안쪽 단계 포함)
+    (스냅샷은 프로세스 전체 기준이라 병렬 분석 중에는 다른 스레드 할당도 포함)
+  - stop_profile() 시 <PROFILE_DIR>/<run_id>/에 저장
+      <단계>.prof        pstats 덤프 (snakeviz, python -m pstats로 열람)
+      <단계>.txt         누적 시간 상위 PROFILE_TOP개 함수
+      <단계>.alloc.txt   순증 할당 상위 PROFILE_TOP개 위치
+      summary.json       단계별 호출 수/소요 시간/순증 할당, 전체 최대 추적 메모리
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_MODE = os.getenv('MRHA_PROFILE', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_TOP = int(os.getenv('PROFILE_TOP', '30'))
+# tracemalloc이 할당마다 저장할 호출 스택 깊이
+PROFILE_FRAMES = int(os.getenv('PROFILE_FRAMES', '1'))
+
+# 모드 -> (cProfile, tracemalloc)
+MODES = {'1': (True, False), 'cpu': (True, False), 'memory': (False, True), 'all': (True, True)}
+OFF_MODES = ('0', 'off', 'false')
+
+logger = logging.getLogger(__name__)
+
+_active = None
+# 스냅샷 비교 시 tracemalloc 자체 할당은 제외
+_SNAPSHOT_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+class _Stage:
+    """단계 1회 실행 중 상태"""
+
+    def __init__(self, name):
+        self.name = name
+        self.profile = None
+        self.snapshot = None
+        self.started = time.perf_counter()
+
+
+class Profiler:
+    """실행 1회의 단계별 프로파일 수집기 (여러 스레드에서 동시에 사용 가능)"""
+
+    def __init__(self, run_id, root=PROFILE_DIR, cpu=True, memory=True):
+        self.run_id = run_id
+        self.path = os.path.join(root, run_id)
+        self.cpu = cpu
+        self.memory = memory
+        self.stats = {}  # 단계 -> pstats.Stats
+        self.allocations = {}  # 단계 -> {위치: [순증 바이트, 순증 블록 수]}
+        self.totals = {}  # 단계 -> {'calls', 'seconds', 'net_kb'}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._owns_tracemalloc = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_FRAMES)
+            self._owns_tracemalloc = True
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enable(self, profile):
+        try:
+            profile.enable()
+            return True
+        except ValueError:
+            # Python 3.12+는 프로세스당 하나의 cProfile만 허용 (병렬 분석 중 다른 스레드가 사용 중)
+            return False
+
+    def begin(self, name):
+        stack = self._stack()
+        if stack and stack[-1].profile is not None:
+            stack[-1].profile.disable()
+        current = _Stage(name)
+        if self.memory:
+            current.snapshot = _snapshot()
+        if self.cpu:
+            profile = cProfile.Profile()
+            if self._enable(profile):
+                current.profile = profile
+        stack.append(current)
+        return current
+
+    def end(self):
+        stack = self._stack()
+        current = stack.pop()
+        if current.profile is not None:
+            current.profile.disable()
+        elapsed = time.perf_counter() - current.started
+        diffs = []
+        if current.snapshot is not None:
+            diffs = _snapshot().compare_to(current.snapshot, 'lineno')
+        if stack and stack[-1].profile is not None and not self._enable(stack[-1].profile):
+            stack[-1].profile = None
+
+        with self._lock:
+            totals = self.totals.setdefault(current.name, {'calls': 0, 'seconds': 0.0, 'net_kb': 0.0})
+            totals['calls'] += 1
+            totals['seconds'] += elapsed
+            if current.profile is not None:
+                if current.name in self.stats:
+                    self.stats[current.name].add(current.profile)
+                else:
+                    self.stats[current.name] = pstats.Stats(current.profile)
+            allocations = self.allocations.setdefault(current.name, {})
+            for diff in diffs:
+                if diff.size_diff == 0:
+                    continue
+                location = str(diff.traceback[0])
+                entry = allocations.setdefault(location, [0, 0])
+                entry[0] += diff.size_diff
+                entry[1] += diff.count_diff
+                totals['net_kb'] += diff.size_diff / 1024
+
+    @contextmanager
+    def stage(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def _cpu_report(self, stats):
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+        return buffer.getvalue()
+
+    def _alloc_report(self, name, allocations):
+        top = sorted(allocations.items(), key=lambda item: item[1][0], reverse=True)[:PROFILE_TOP]
+        lines = [f"# {name}: 순증 할당 상위 {len(top)}개 위치 (KiB, 블록 수)"]
+        lines += [f"{size / 1024:12.1f} KiB {count:10d}  {location}"
+                  for location, (size, count) in top]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """열린 단계를 닫고 보고서를 저장한 뒤 저장 경로 반환"""
+        stack = self._stack()
+        while stack:
+            self.end()
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024 if tracemalloc.is_tracing() else None
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            for name, stats in self.stats.items():
+                stats.dump_stats(os.path.join(self.path, f"{name}.prof"))
+                with open(os.path.join(self.path, f"{name}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(self._cpu_report(stats))
+            for name, allocations in self.allocations.items():
+                with open(os.path.join(self.path, f"{name}.alloc.txt"), 'w', encoding='utf-8') as f:
+                    f.write(self._alloc_report(name, allocations))
+            summary = {
+                'run': self.run_id,
+                'cpu': self.cpu,
+                'memory': self.memory,
+                'peak_traced_kb': peak_kb,
+                'stages': self.totals,
+            }
+        with open(os.path.join(self.path, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return self.path
+
+
+def parse_mode(mode):
+    """프로파일 모드 정규화 (끔이면 None, 알 수 없는 값이면 ValueError)"""
+    mode = (mode or '').strip().lower()
+    if mode in ('',) + OFF_MODES:
+        return None
+    if mode not in MODES:
+        raise ValueError(f"Unknown MRHA_PROFILE mode: {mode} "
+                         f"(choose from {', '.join(tuple(MODES) + OFF_MODES)})")
+    return mode
+
+
+def start_profile(run_id, mode=None, root=PROFILE_DIR):
+    """mode(기본 MRHA_PROFILE)가 켜져 있으면 프로파일러를 만들어 활성화, 꺼져 있으면 None
+
+    환경 변수 값이 잘못되었으면 실행을 막지 않고 경고 후 끈 상태로 둡니다.
+    """
+    global _active
+    if mode is None:
+        try:
+            mode = parse_mode(PROFILE_MODE)
+        except ValueError as e:
+            logger.error("프로파일링 비활성화: %s", e)
+            return None
+    else:
+        mode = parse_mode(mode)
+    if mode is None:
+        return None
+    if _active is not None:
+        stop_profile()
+    cpu, memory = MODES[mode]
+    _active = Profiler(run_id, root, cpu=cpu, memory=memory)
+    logger.info("프로파일링 시작 (%s): %s", mode, _active.path)
+    return _active
+
+
+def stop_profile():
+    """활성 프로파일러 보고서 저장 후 비활성화 (저장 경로 반환, 없으면 None)"""
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return None
+    path = profiler.close()
+    logger.info("프로파일 저장: %s", path)
+    return path
+
+
+def current_profiler():
+    return _active
+
+
+def set_stage(name):
+    """현재 스레드의 바깥 단계를 name으로 전환 (with 블록 없이 순차 단계를 표시할 때)"""
+    profiler = _active
+    if profiler is None:
+        return
+    stack = profiler._stack()
+    while stack:
+        profiler.end()
+    profiler.begin(name)
+
+
+@contextmanager
+def stage(name):
+    """활성 프로파일러에 단계 구간 기록 (없으면 no-op)"""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
@@ -1,16 +1,43 @@
+import argparse
+import logging
 import os
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 import pyupbit
 import pandas as pd
 from notion_manager import NotionManager
 from slack_notifier import SlackNotifier
 from class_mrha import MRHATradingSystem
+from checkpoint import RunCheckpoint
+from historical_loader import candle_start, interval_to_timedelta
+from log_config import log_context, set_log_context, setup_logging
+from memory_monitor import MemoryMonitor
+from profiling import MODES as PROFILE_MODES, OFF_MODES as PROFILE_OFF_MODES
+from profiling import parse_mode, set_stage, start_profile, stop_profile
+from scheduler import CandleScheduler
+from signal_pipeline import CheckpointSink, LedgerSink, SignalPipeline, SlackSink
+from signal_cache import SignalCache
+from state_store import NotionMirror, StateStore
+from ticker_ranking import TradingValueRanking, upbit_ticker_feed
+from tracing import span, start_trace
 
 # .env 파일 로드
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# 스트리밍 파이프라인 모드의 분석 워커 수
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 3))
+# 주문 체결 확인 최대 대기/조회 간격 (초)
+ORDER_FILL_TIMEOUT = float(os.getenv('ORDER_FILL_TIMEOUT', 10))
+ORDER_FILL_POLL = 0.2
+# 실행 끝에 Notion 미러가 따라잡기를 기다리는 최대 시간 (초, 분봉 사이클은 다음 캔들을 막지 않도록 짧게)
+NOTION_FLUSH_TIMEOUT = float(os.getenv('NOTION_FLUSH_TIMEOUT', 600))
+NOTION_CYCLE_FLUSH_TIMEOUT = float(os.getenv('NOTION_CYCLE_FLUSH_TIMEOUT', 5))
+# 1이면 새로 계산한 티커별 분석/백테스트 결과를 Parquet로 내보냄 (result_export.py, pyarrow 필요)
+EXPORT_RESULTS = os.getenv('EXPORT_RESULTS') == '1'
+
 def get_account_balance():
     """업비트 계좌 잔고 조회"""
     try:
@@ -19,11 +46,11 @@ def get_account_balance():
         upbit = pyupbit.Upbit(access_key, secret_key)
         return upbit.get_balances()
     except Exception as e:
-        print(f"Error getting account balance: {e}")
+        logger.error("Error getting account balance: %s", e)
         return []
 
-def update_portfolio_db(notion_manager, balances):
-    """포트폴리오 DB 업데이트"""
+def update_portfolio_db(notion_manager, balances, state_store=None):
+    """포트폴리오 DB 업데이트 (로컬 원장에 먼저 기록 후 Notion 반영)"""
     try:
         portfolio_data = []
         
@@ -56,17 +83,27 @@ def update_portfolio_db(notion_manager, balances):
                         'total_value': total_value
                     })
         
-        # Notion DB 업데이트
+        # 로컬 원장 기록 후 Notion DB 업데이트 (NotionMirror면 비동기)
+        if state_store is not None:
+            state_store.record_portfolio(portfolio_data)
         notion_manager.update_portfolio(portfolio_data)
-        print("포트폴리오 DB 업데이트 완료")
+        logger.info("포트폴리오 DB 업데이트 완료")
         
         return portfolio_data
     except Exception as e:
-        print(f"Error updating portfolio DB: {e}")
+        logger.error("Error updating portfolio DB: %s", e)
         return []
 
-def get_top_volume_coins(limit=10, owned_coins=None):
-    """거래량 상위 코인 추출 (보유 코인 포함)"""
+def get_top_volume_coins(limit=10, owned_coins=None, ranking=None):
+    """거래량 상위 코인 추출 (보유 코인 포함)
+
+    ranking(TradingValueRanking)이 최신 상태면 스트림으로 유지되는 순위를 바로 사용하고,
+    아니면 전 마켓을 조회해 정렬합니다.
+    """
+    if ranking is not None and ranking.is_fresh():
+        logger.info("스트리밍 거래대금 순위 사용 (%d개 마켓)", len(ranking))
+        return ranking.top(limit, owned_coins)
+
     try:
         # 모든 코인 정보 조회
         tickers = pyupbit.get_tickers(fiat="KRW")
@@ -87,7 +124,7 @@ def get_top_volume_coins(limit=10, owned_coins=None):
                         'is_owned': ticker in owned_tickers
                     })
             except Exception as e:
-                print(f"Error getting data for {ticker}: {e}")
+                logger.warning("Error getting data for %s: %s", ticker, e)
                 continue
         
         # 거래량 기준 정렬
@@ -108,86 +145,124 @@ def get_top_volume_coins(limit=10, owned_coins=None):
         return top_coins
         
     except Exception as e:
-        print(f"Error getting top volume coins: {e}")
+        logger.error("Error getting top volume coins: %s", e)
         return []
 
-def execute_trade(signal, notion_manager, upbit):
-    """거래 실행"""
+def submit_order(upbit, side, ticker, amount):
+    """시장가 주문 후 체결 확인까지 추적 (체결 확인된 주문 조회 결과 또는 주문 결과 반환)"""
+    with span('order_submit', ticker=ticker, side=side):
+        if side == 'SELL':
+            result = upbit.sell_market_order(ticker, amount)
+        else:
+            result = upbit.buy_market_order(ticker, amount)
+    if not result or 'uuid' not in result:
+        return result
+    with span('order_fill', ticker=ticker, side=side, uuid=result['uuid']) as tags:
+        order = wait_for_fill(upbit, result['uuid'])
+        tags['state'] = order.get('state') if order else None
+        tags['filled'] = is_filled(order)
+    return order if tags['filled'] else result
+
+def is_filled(order):
+    """시장가 주문 체결 여부 (시장가 매수는 잔액 취소로 cancel 상태가 될 수 있음)"""
+    return bool(order) and order.get('state') in ('done', 'cancel') and float(order.get('executed_volume') or 0) > 0
+
+def wait_for_fill(upbit, uuid, timeout=ORDER_FILL_TIMEOUT):
+    """체결되거나 timeout이 지날 때까지 주문 상태 조회"""
+    deadline = time.monotonic() + timeout
+    order = None
+    while time.monotonic() < deadline:
+        try:
+            order = upbit.get_order(uuid)
+        except Exception as e:
+            logger.warning("주문 조회 실패 (%s): %s", uuid, e)
+        if is_filled(order) or (order and order.get('state') == 'cancel'):
+            return order
+        time.sleep(ORDER_FILL_POLL)
+    logger.warning("주문 체결 확인 시간 초과: %s", uuid)
+    return order
+
+def execute_trade(signal, notion_manager, upbit, state_store):
+    """거래 실행 (signal은 로컬 원장의 시그널 행)"""
+    ticker = signal['ticker']
     try:
-        ticker = signal['properties']['Ticker']['select']['name']
-        signal_type = signal['properties']['Signal']['select']['name']
+        signal_type = signal['signal']
         full_ticker = f"KRW-{ticker}"
-        signal_id = signal['id']  # 시그널 ID 저장
+        signal_id = signal['id']  # 로컬 원장 시그널 ID
         
         if signal_type == 'SELL':
             # 보유 수량 확인
             balance = upbit.get_balance(full_ticker)
             if balance > 0:
                 # 시장가 매도
-                result = upbit.sell_market_order(full_ticker, balance)
+                result = submit_order(upbit, 'SELL', full_ticker, balance)
                 if result:
-                    print(f"{ticker} {balance}개 시장가 매도 완료")
+                    logger.info("%s %s개 시장가 매도 완료", ticker, balance)
+                    state_store.record_execution(signal_id, ticker, 'SELL', amount=balance, order=result)
                     # 계좌 잔고 업데이트
                     balances = upbit.get_balances()
-                    update_portfolio_db(notion_manager, balances)
+                    update_portfolio_db(notion_manager, balances, state_store)
                     # 시그널 상태 업데이트
+                    state_store.update_signal_status(signal_id, "DONE")
                     notion_manager.update_signal_status(signal_id, "DONE")
-                    print(f"{ticker} 시그널 상태 업데이트: DONE")
+                    logger.info("%s 시그널 상태 업데이트: DONE", ticker)
                 else:
-                    print(f"{ticker} 매도 실패")
+                    logger.error("%s 매도 실패", ticker)
             else:
-                print(f"{ticker} 보유 수량 없음")
+                logger.info("%s 보유 수량 없음", ticker)
+                state_store.update_signal_status(signal_id, "DONE")
                 notion_manager.update_signal_status(signal_id, "DONE")
-                print(f"{ticker} 시그널 상태 업데이트: DONE (보유 수량 없음)")
+                logger.info("%s 시그널 상태 업데이트: DONE (보유 수량 없음)", ticker)
         
         elif signal_type == 'BUY':
             # KRW 잔고 확인
             krw_balance = upbit.get_balance("KRW")
             if krw_balance >= 1000000:  # 100만원 이상
                 # 시장가 매수
-                result = upbit.buy_market_order(full_ticker, 1000000)
+                result = submit_order(upbit, 'BUY', full_ticker, 1000000)
                 if result:
-                    print(f"{ticker} 100만원 시장가 매수 완료")
+                    logger.info("%s 100만원 시장가 매수 완료", ticker)
+                    state_store.record_execution(signal_id, ticker, 'BUY', krw_amount=1000000, order=result)
                     # 계좌 잔고 업데이트
                     balances = upbit.get_balances()
-                    update_portfolio_db(notion_manager, balances)
+                    update_portfolio_db(notion_manager, balances, state_store)
                     # 시그널 상태 업데이트
+                    state_store.update_signal_status(signal_id, "DONE")
                     notion_manager.update_signal_status(signal_id, "DONE")
-                    print(f"{ticker} 시그널 상태 업데이트: DONE")
+                    logger.info("%s 시그널 상태 업데이트: DONE", ticker)
                 else:
-                    print(f"{ticker} 매수 실패")
+                    logger.error("%s 매수 실패", ticker)
             else:
-                print(f"KRW 잔고 부족: {krw_balance}")
+                logger.warning("KRW 잔고 부족: %s", krw_balance)
+                state_store.update_signal_status(signal_id, "DONE", error_message="KRW 잔고 부족")
                 notion_manager.update_signal_status(signal_id, "DONE")
-                print(f"{ticker} 시그널 상태 업데이트: DONE (잔고 부족)")
+                logger.info("%s 시그널 상태 업데이트: DONE (잔고 부족)", ticker)
         
         elif signal_type == 'HOLD':
             # HOLD 시그널은 바로 DONE으로 업데이트
+            state_store.update_signal_status(signal_id, "DONE")
             notion_manager.update_signal_status(signal_id, "DONE")
-            print(f"{ticker} 시그널 상태 업데이트: DONE (HOLD)")
+            logger.info("%s 시그널 상태 업데이트: DONE (HOLD)", ticker)
         
         return True
     except Exception as e:
-        print(f"Error executing trade for {ticker}: {e}")
+        logger.exception("Error executing trade for %s: %s", ticker, e)
         return False
 
-def verify_signal_execution(notion_manager):
+def verify_signal_execution(state_store, date=None):
     """시그널 실행 상태 확인"""
     try:
-        # PENDING 시그널 조회
-        pending_signals = notion_manager.get_pending_signals()
+        # PENDING 시그널 조회 (로컬 원장)
+        pending_signals = state_store.get_pending_signals(date)
         if pending_signals:
-            print("\n=== 미실행 시그널 확인 ===")
             for signal in pending_signals:
-                ticker = signal['properties']['Ticker']['select']['name']
-                signal_type = signal['properties']['Signal']['select']['name']
-                print(f"{ticker}: {signal_type} 시그널이 아직 실행되지 않음")
+                logger.warning("%s: %s 시그널이 아직 실행되지 않음", signal['ticker'], signal['signal'])
             return False
         else:
-            print("\n모든 시그널이 성공적으로 실행되었습니다.")
+            logger.info("모든 시그널이 성공적으로 실행되었습니다.")
             return True
     except Exception as e:
-        print(f"시그널 실행 상태 확인 중 오류 발생: {e}")
+        logger.error("시그널 실행 상태 확인 중 오류 발생: %s", e)
         return False
 
 def get_current_balance():
@@ -220,7 +295,7 @@ def get_current_balance():
             'coins': coins
         }
     except Exception as e:
-        print(f"Error getting current balance: {e}")
+        logger.error("Error getting current balance: %s", e)
         return {'total_balance': 0, 'coins': {}}
 
 def get_portfolio_data(balance_info):
@@ -260,7 +335,7 @@ def get_portfolio_data(balance_info):
         
         return portfolio_data
     except Exception as e:
-        print(f"Error getting portfolio data: {e}")
+        logger.error("Error getting portfolio data: %s", e)
         return []
 
 def wait_until_signal_generation_time():
@@ -272,7 +347,7 @@ def wait_until_signal_generation_time():
         signal_time = signal_time.replace(day=signal_time.day + 1)
     
     wait_seconds = (signal_time - now).total_seconds()
-    print(f"시그널 생성까지 {wait_seconds/3600:.1f}시간 대기 중...")
+    logger.info("시그널 생성까지 %.1f시간 대기 중...", wait_seconds / 3600)
     time.sleep(wait_seconds)
 
 def wait_until_execution_time():
@@ -284,38 +359,135 @@ def wait_until_execution_time():
         execution_time = execution_time.replace(day=execution_time.day + 1)
     
     wait_seconds = (execution_time - now).total_seconds()
-    print(f"시그널 실행까지 {wait_seconds/3600:.1f}시간 대기 중...")
+    logger.info("시그널 실행까지 %.1f시간 대기 중...", wait_seconds / 3600)
     time.sleep(wait_seconds)
 
-def run_trading_system():
-    # 시스템 초기화
-    notion_manager = NotionManager()
-    slack = SlackNotifier()
-    access_key = os.getenv('UPBIT_ACCESS_KEY')
-    secret_key = os.getenv('UPBIT_SECRET_KEY')
-    upbit = pyupbit.Upbit(access_key, secret_key)
+def is_past_execution_time():
+    """오늘 시그널 실행 시간(09:05:00)이 지났는지"""
+    now = datetime.now()
+    return now >= now.replace(hour=9, minute=5, second=0, microsecond=0)
+
+def get_previous_bar_signal(trades, bar_start, bar_end):
+    """[bar_start, bar_end) 캔들에서 발생한 매매를 BUY/SELL 시그널로 변환 (없으면 HOLD)"""
+    for _, trade in trades.iterrows():
+        if bar_start <= trade['Date'] < bar_end:
+            return "BUY" if trade['Type'] == 'Buy' else "SELL"
+    return "HOLD"
+
+def export_analysis(bot, cycle_start):
+    """분석 결과 Parquet 내보내기 (실패해도 트레이딩은 계속)"""
+    from result_export import export_results
+    try:
+        export_results(bot, run_id=f"{cycle_start:%Y%m%d_%H%M}")
+    except Exception as e:
+        logger.warning("%s: 결과 내보내기 실패: %s", bot.symbol, e)
+
+def analyze_coin(coin, interval, cycle_start, signal_cache):
+    """코인 1개 MRHA 분석 후 직전 캔들 시그널 dict 반환"""
+    with log_context(ticker=coin['ticker']):
+        # MRHA 분석 실행 (직전 캔들 포함 365개 캔들)
+        bot = MRHATradingSystem(coin['ticker'], interval, count=365)
+        if bot.load_cached(signal_cache, cycle_start):
+            logger.info("%s: 캐시된 분석 결과 사용", coin['ticker'])
+        else:
+            bot.run_analysis(cache=signal_cache)
+            if EXPORT_RESULTS:
+                export_analysis(bot, cycle_start)
+    
+    # 직전 캔들 시그널 확인
+    previous_bar = cycle_start - interval_to_timedelta(interval)
+    signal = get_previous_bar_signal(bot.trades, previous_bar, cycle_start)
+    bot.release()  # 티커별 DataFrame은 바로 해제
+    return {
+        'ticker': coin['ticker'].replace('KRW-', ''),
+        'rank': coin['rank'],
+        'trading_value': coin['trading_value'],
+        'signal': signal,
+        'status': 'PENDING'
+    }
+
+def create_services():
+    """실행 간 재사용할 클라이언트/저장소 (로컬 원장, Notion 미러, Slack, 업비트, 분석 캐시)"""
+    state_store = StateStore()
+    return {
+        'state_store': state_store,
+        'notion_manager': NotionMirror(NotionManager(), state_store),
+        'slack': SlackNotifier(),
+        'upbit': pyupbit.Upbit(os.getenv('UPBIT_ACCESS_KEY'), os.getenv('UPBIT_SECRET_KEY')),
+        'signal_cache': SignalCache(),
+    }
+
+def close_services(services, timeout=60):
+    """create_services()로 만든 Notion 미러 스레드와 로컬 원장 연결 정리"""
+    if not services['notion_manager'].close(timeout):
+        logger.warning("Notion 미러 종료 대기 시간 초과 (남은 작업은 버려짐)")
+    services['state_store'].close()
+
+def run_trading_system(ranking=None, resume=False, interval="day", cycle_start=None, deadline=None,
+                       pipelined=None, services=None, profile=None):
+    """트레이딩 1회 실행 (일봉이면 하루치, 분봉이면 캔들 1개 사이클)
+
+    resume=True면 오늘 체크포인트에서 완료된 단계(잔고, 유니버스, 티커별 시그널,
+    시그널 게시)를 건너뛰고, 실행 시간이 지났으면 남은 주문을 바로 처리합니다.
+    deadline이 주어지면 그 이후로는 남은 티커 분석을 건너뛰고, 분봉 사이클이
+    다음 캔들까지 넘어가면 오래된 시그널은 실행하지 않습니다.
+    pipelined=True(기본값: SIGNAL_PIPELINE=1)면 티커 분석을 병렬로 하면서
+    준비된 시그널부터 바로 게시합니다.
+    services(create_services())를 주면 클라이언트를 새로 만들지 않고 재사용하며,
+    주지 않으면 이번 실행용으로 만들고 끝날 때 close_services()로 정리합니다.
+    profile(기본값: MRHA_PROFILE)이 켜져 있으면 단계별 CPU/메모리 프로파일을
+    profiles/<실행 단위>_<시각>/에 저장합니다.
+    """
+    if pipelined is None:
+        pipelined = os.getenv('SIGNAL_PIPELINE') == '1'
+    # 시스템 초기화 (로컬 원장이 주 저장소, Notion은 비동기 미러)
+    owns_services = services is None
+    services = services or create_services()
+    state_store = services['state_store']
+    notion_manager = services['notion_manager']
+    slack = services['slack']
+    upbit = services['upbit']
+    bar_delta = interval_to_timedelta(interval)
+    cycle_start = cycle_start or candle_start(interval)
+    # 원장/체크포인트 실행 단위: 일봉은 날짜, 분봉은 캔들 시작 시각
+    if interval == "day":
+        today = datetime.now().strftime("%Y-%m-%d")
+    else:
+        today = f"{cycle_start:%Y-%m-%dT%H%M}-{interval}"
+    checkpoint = RunCheckpoint(today)
+    checkpoint.prune()
+    set_log_context(run=today, stage='start')
+    # 캔들 마감(사이클 시작) 시각 기준 구간 추적
+    tracer = start_trace(today, origin=cycle_start)
     
     # 시작 알림 (에러 처리 추가)
     try:
-        print("Slack 메시지 전송 시도...")
         result = slack.send_notification(f"""
 🚀 MRHA 트레이딩 시스템 시작
 시작시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 상태: 정상 작동 중
 """)
-        print(f"Slack 메시지 전송 결과: {'성공' if result else '실패'}")
+        logger.info("시작 알림 전송 결과: %s", '성공' if result else '실패')
     except Exception as e:
-        print(f"Slack 메시지 전송 중 에러 발생: {e}")
+        logger.error("Slack 메시지 전송 중 에러 발생: %s", e)
     
     try:
+        start_profile(f"{today}_{datetime.now():%H%M%S}", mode=profile)
+        
         # 1. 계좌 잔고 조회 및 포트폴리오 DB 업데이트
-        print("\n=== 계좌 잔고 조회 및 포트폴리오 업데이트 ===")
-        balances = get_account_balance()
-        portfolio_data = update_portfolio_db(notion_manager, balances)
+        set_log_context(stage='portfolio')
+        set_stage('portfolio')
+        if resume and checkpoint.has('portfolio'):
+            portfolio_data = checkpoint.load('portfolio')['portfolio']
+            logger.info("체크포인트에서 포트폴리오 복원")
+        else:
+            balances = get_account_balance()
+            portfolio_data = update_portfolio_db(notion_manager, balances, state_store)
+            checkpoint.save('portfolio', {'balances': balances, 'portfolio': portfolio_data})
         
         # 보유 중인 코인 목록 추출
         owned_coins = [item['ticker'] for item in portfolio_data if item['ticker'] != 'KRW']
-        print(f"보유 중인 코인: {owned_coins}")
+        logger.info("보유 중인 코인: %s", owned_coins)
         
         # Slack 알림: 포트폴리오 업데이트
         slack.send_notification(f"""
@@ -325,9 +497,15 @@ KRW 잔고: {next((item['amount'] for item in portfolio_data if item['ticker'] =
 """)
         
         # 2. Top 10 코인 선별 (거래량 기준 + 보유 코인)
-        print("\n=== Top 10 코인 선별 ===")
-        top_coins = get_top_volume_coins(limit=10, owned_coins=owned_coins)
-        print(f"선별된 코인 수: {len(top_coins)}개")
+        set_log_context(stage='universe')
+        set_stage('universe')
+        if resume and checkpoint.has('universe'):
+            top_coins = checkpoint.load('universe')
+            logger.info("체크포인트에서 유니버스 복원")
+        else:
+            top_coins = get_top_volume_coins(limit=10, owned_coins=owned_coins, ranking=ranking)
+            checkpoint.save('universe', top_coins)
+        logger.info("선별된 코인 수: %d개", len(top_coins))
         
         # Slack 알림: 선정된 코인
         selected_coins = [coin['ticker'].replace('KRW-', '') for coin in top_coins]
@@ -337,98 +515,134 @@ KRW 잔고: {next((item['amount'] for item in portfolio_data if item['ticker'] =
 """)
         
         # 3. MRHA 시그널 생성
-        print("\n=== MRHA 시그널 생성 ===")
-        signals = []
-        signal_summary = {'BUY': [], 'SELL': [], 'HOLD': []}
-        
-        # 전일 날짜 계산
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        for coin in top_coins:
-            try:
-                # MRHA 분석 실행 (전일 일봉 포함 365일 데이터)
-                bot = MRHATradingSystem(coin['ticker'], "day", count=365)
-                bot.run_analysis()
-                
-                # 전일 시그널 확인
-                last_signal = "HOLD"
-                for _, trade in bot.trades.iterrows():
-                    trade_date = trade['Date'].strftime("%Y-%m-%d")
-                    if trade_date == yesterday:
-                        last_signal = "BUY" if trade['Type'] == 'Buy' else "SELL"
-                        break
-                
-                signals.append({
-                    'ticker': coin['ticker'].replace('KRW-', ''),
-                    'rank': coin['rank'],
-                    'trading_value': coin['trading_value'],
-                    'signal': last_signal,
-                    'status': 'PENDING'
-                })
-                signal_summary[last_signal].append(coin['ticker'].replace('KRW-', ''))
-                print(f"{coin['ticker']}: {last_signal} 시그널 생성")
+        set_log_context(stage='signals')
+        set_stage('signals')
+        # 티커별 시그널 체크포인트 (재시작 시 계산된 티커는 건너뜀)
+        computed = checkpoint.load('signals', {}) if resume else {}
+        # 같은 캔들 재실행 시 분석 결과 재사용 (현재 캔들 시작 시각 기준)
+        signal_cache = services['signal_cache']
+        skipped_tickers = []
+        
+        def produce(coin):
+            if coin['ticker'] in computed:
+                return computed[coin['ticker']]
+            if deadline is not None and datetime.now() > deadline:
+                # 예산 초과: 남은 티커는 이번 사이클에서 분석하지 않음
+                skipped_tickers.append(coin['ticker'].replace('KRW-', ''))
+                return None
+            signal = analyze_coin(coin, interval, cycle_start, signal_cache)
+            logger.info("%s: %s 시그널 생성", coin['ticker'], signal['signal'])
+            return signal
+        
+        if pipelined and not (resume and checkpoint.has('published')):
+            # 3-4. 스트리밍 모드: 준비된 시그널부터 원장(Notion 미러)/Slack에 바로 게시
+            pipeline = SignalPipeline(produce, [
+                CheckpointSink(checkpoint, computed),
+                LedgerSink(state_store, notion_manager, today),
+                SlackSink(slack),
+            ], workers=PIPELINE_WORKERS)
+            signals = pipeline.run(top_coins)
+            checkpoint.save('published', {'at': datetime.now().isoformat(), 'count': len(signals)})
+            if skipped_tickers:
+                slack.send_notification(f"예산 초과로 건너뜀: {', '.join(skipped_tickers)}")
+            logger.info("시그널 DB 업데이트 완료")
+        else:
+            signals = []
+            signal_summary = {'BUY': [], 'SELL': [], 'HOLD': []}
+            for coin in top_coins:
+                try:
+                    signal = produce(coin)
+                except Exception as e:
+                    logger.exception("Error processing %s: %s", coin['ticker'], e)
+                    continue
+                if signal is None:
+                    continue
+                signals.append(signal)
+                computed[coin['ticker']] = signal
+                checkpoint.save('signals', computed)
+                signal_summary[signal['signal']].append(signal['ticker'])
             
-            except Exception as e:
-                print(f"Error processing {coin['ticker']}: {e}")
-                continue
-        
-        # Slack 알림: 시그널 생성 결과
-        slack.send_notification(f"""
+            # Slack 알림: 시그널 생성 결과
+            slack.send_notification(f"""
 📈 MRHA 시그널 생성 완료
 BUY: {', '.join(signal_summary['BUY']) if signal_summary['BUY'] else '없음'}
 SELL: {', '.join(signal_summary['SELL']) if signal_summary['SELL'] else '없음'}
 HOLD: {', '.join(signal_summary['HOLD']) if signal_summary['HOLD'] else '없음'}
-""")
-        
-        # 4. Notion DB 업데이트
-        notion_manager.update_daily_signals(signals)
-        print("시그널 DB 업데이트 완료")
+""" + (f"예산 초과로 건너뜀: {', '.join(skipped_tickers)}\n" if skipped_tickers else ""))
+            
+            # 4. 로컬 원장 기록 후 Notion DB 미러링
+            if resume and checkpoint.has('published'):
+                logger.info("시그널 DB 업데이트 이미 완료 (체크포인트)")
+            else:
+                with span('publish', count=len(signals)):
+                    signal_rows = state_store.replace_daily_signals(today, signals)
+                    notion_manager.update_daily_signals(signal_rows)
+                checkpoint.save('published', {'at': datetime.now().isoformat(), 'count': len(signal_rows)})
+                logger.info("시그널 DB 업데이트 완료")
+        
+        # 분봉 사이클이 다음 캔들까지 넘어갔으면 오래된 시그널은 실행하지 않음
+        if interval != "day" and datetime.now() >= cycle_start + bar_delta:
+            for signal in state_store.get_pending_signals(today):
+                state_store.update_signal_status(signal['id'], "SKIPPED", error_message="stale cycle")
+                notion_manager.update_signal_status(signal['id'], "SKIPPED")
+            slack.notify_error("사이클 시그널 만료", f"{today}: 다음 캔들 시작 후라 주문을 실행하지 않음")
+            checkpoint.mark_complete()
+            return False
         
-        # 5. 시그널 실행 시간까지 대기
-        print("\n시그널 실행 시간까지 대기 중...")
-        slack.send_notification("⏳ 시그널 실행 시간까지 대기 중...")
-        wait_until_execution_time()
+        # 5. 시그널 실행 시간까지 대기 (일봉만, 이미 지났으면 바로 실행)
+        if interval == "day" and not is_past_execution_time():
+            slack.send_notification("⏳ 시그널 실행 시간까지 대기 중...")
+            wait_until_execution_time()
         
         # 6. 계좌 정보 재조회
-        print("\n=== 계좌 정보 재조회 ===")
+        set_log_context(stage='execution')
+        set_stage('execution')
         balances = get_account_balance()
-        portfolio_data = update_portfolio_db(notion_manager, balances)
+        portfolio_data = update_portfolio_db(notion_manager, balances, state_store)
         
         # 7. PENDING 시그널 실행
-        print("\n=== 시그널 실행 시작 ===")
         slack.send_notification("🔄 시그널 실행 시작")
         
-        # PENDING 시그널 조회
-        pending_signals = notion_manager.get_pending_signals()
-        print(f"PENDING 시그널 수: {len(pending_signals)}")
+        # 주문 기록은 있는데 상태 갱신 전에 중단된 시그널은 재주문하지 않음
+        for signal in state_store.get_pending_signals(today):
+            if state_store.get_executions(signal_id=signal['id']):
+                state_store.update_signal_status(signal['id'], "DONE")
+                notion_manager.update_signal_status(signal['id'], "DONE")
+        checkpoint.save('execution', {'started_at': datetime.now().isoformat()})
+        
+        # PENDING 시그널 조회 (로컬 원장)
+        pending_signals = state_store.get_pending_signals(today)
+        logger.info("PENDING 시그널 수: %d", len(pending_signals))
         
         # SELL 시그널 먼저 실행
-        sell_signals = [s for s in pending_signals if s['properties']['Signal']['select']['name'] == 'SELL']
+        sell_signals = [s for s in pending_signals if s['signal'] == 'SELL']
         if sell_signals:
             slack.send_notification("💰 SELL 시그널 실행 시작")
             for signal in sell_signals:
-                execute_trade(signal, notion_manager, upbit)
+                execute_trade(signal, notion_manager, upbit, state_store)
         
         # BUY 시그널 실행
-        buy_signals = [s for s in pending_signals if s['properties']['Signal']['select']['name'] == 'BUY']
+        buy_signals = [s for s in pending_signals if s['signal'] == 'BUY']
         if buy_signals:
             slack.send_notification("💎 BUY 시그널 실행 시작")
             for signal in buy_signals:
-                execute_trade(signal, notion_manager, upbit)
+                execute_trade(signal, notion_manager, upbit, state_store)
         
         # HOLD 시그널 실행
-        hold_signals = [s for s in pending_signals if s['properties']['Signal']['select']['name'] == 'HOLD']
+        hold_signals = [s for s in pending_signals if s['signal'] == 'HOLD']
         if hold_signals:
             slack.send_notification("⏸️ HOLD 시그널 처리 시작")
             for signal in hold_signals:
-                execute_trade(signal, notion_manager, upbit)
+                execute_trade(signal, notion_manager, upbit, state_store)
         
         # 시그널 실행 상태 확인
-        execution_status = verify_signal_execution(notion_manager)
+        set_log_context(stage='verify')
+        set_stage('verify')
+        execution_status = verify_signal_execution(state_store, today)
         
         # 최종 포트폴리오 상태 조회
         final_balances = get_account_balance()
-        final_portfolio = update_portfolio_db(notion_manager, final_balances)
+        final_portfolio = update_portfolio_db(notion_manager, final_balances, state_store)
         
         # Slack 알림: 작업 완료
         slack.send_notification(f"""
@@ -436,24 +650,96 @@ HOLD: {', '.join(signal_summary['HOLD']) if signal_summary['HOLD'] else '없음'
 시그널 실행 상태: {'성공' if execution_status else '일부 미실행'}
 최종 KRW 잔고: {next((item['amount'] for item in final_portfolio if item['ticker'] == 'KRW'), 0):,.0f}원
 보유 코인: {', '.join([item['ticker'] for item in final_portfolio if item['ticker'] != 'KRW']) if any(item['ticker'] != 'KRW' for item in final_portfolio) else '없음'}
-""")
+""" + tracer.format_summary())
+        
+        checkpoint.mark_complete()
         
-        print("\n=== 작업 완료 ===")
+        # 실행이 끝난 뒤 Notion 미러가 따라잡을 시간을 줌 (남은 작업은 백그라운드에서 계속)
+        flush_timeout = NOTION_FLUSH_TIMEOUT if interval == "day" else NOTION_CYCLE_FLUSH_TIMEOUT
+        if not notion_manager.flush(timeout=flush_timeout):
+            logger.warning("Notion 미러 작업 %d건이 아직 남아 있습니다 (백그라운드에서 계속)",
+                           notion_manager.pending())
+        
+        logger.info("작업 완료")
         return True
         
     except Exception as e:
         error_message = f"작업 중 오류 발생: {e}"
-        print(error_message)
+        logger.exception(error_message)
         slack.send_notification(f"❌ {error_message}")
         return False
+    finally:
+        stop_profile()
+        if owns_services:
+            close_services(services)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MRHA 실시간 트레이더")
+    parser.add_argument("--interval", default=os.getenv('TRADING_INTERVAL', 'day'),
+                        help="day(09:01 일일 실행) 또는 minute60, minute15 등 장중 인터벌")
+    parser.add_argument("--daemon", action="store_true", default=os.getenv('DAEMON_MODE') == '1',
+                        help="사이클마다 메모리(RSS) 추세를 감시")
+    parser.add_argument("--profile", nargs="?", const="cpu", default=os.getenv('MRHA_PROFILE', ''),
+                        type=str.lower, choices=list(PROFILE_MODES) + list(PROFILE_OFF_MODES),
+                        help="단계별 프로파일을 profiles/<실행>/에 저장 (기본 cpu, memory, all: 시간은 부풀려짐)")
+    args = parser.parse_args()
+    # 잘못된 MRHA_PROFILE 값은 실행마다 실패하지 않도록 시작할 때 거부
+    try:
+        args.profile = parse_mode(args.profile) or '0'
+    except ValueError as e:
+        parser.error(str(e))
+    if EXPORT_RESULTS:
+        # pyarrow가 없으면 티커마다 실패하기 전에 시작 시점에 알림
+        from result_export import require_pyarrow
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            parser.error(f"EXPORT_RESULTS=1: {e}")
+    setup_logging()
+
+    # 클라이언트/원장/Notion 미러는 한 번만 만들어 실행마다 재사용, 데몬 모드는 실행마다 RSS 샘플링
+    services = create_services()
+    monitor = MemoryMonitor(notifier=services['slack']) if args.daemon else None
+
+    # STREAM_RANKING=1이면 티커 웹소켓으로 거래대금 순위를 상시 유지
+    ranking = None
+    if os.getenv('STREAM_RANKING') == '1':
+        ranking = TradingValueRanking()
+        ranking.start(upbit_ticker_feed())
+
+    if args.interval != "day":
+        # 장중 모드: 캔들 마감마다 사이클 실행
+        def run_cycle(cycle, deadline):
+            try:
+                run_trading_system(ranking=ranking, resume=True, interval=args.interval,
+                                   cycle_start=cycle, deadline=deadline, services=services,
+                                   profile=args.profile)
+            finally:
+                if monitor is not None:
+                    monitor.sample(f"{cycle:%Y-%m-%d %H:%M}")
+
+        CandleScheduler(args.interval, run_cycle, notifier=services['slack']).run_forever()
+
     while True:
         try:
-            # 시그널 생성 시간까지 대기
-            wait_until_signal_generation_time()
-            # 트레이딩 시스템 실행
-            run_trading_system()
+            checkpoint = RunCheckpoint()
+            if checkpoint.in_progress():
+                # 오늘 실행이 중간에 끊겼으면 대기 없이 이어서 실행
+                logger.warning("미완료 실행 발견 (%s), 체크포인트에서 재개", checkpoint.date)
+            else:
+                # 시그널 생성 시간까지 대기
+                wait_until_signal_generation_time()
+                checkpoint = RunCheckpoint()
+            if checkpoint.begin_attempt():
+                # 트레이딩 시스템 실행
+                succeeded = run_trading_system(ranking=ranking, resume=True, services=services,
+                                               profile=args.profile)
+                if monitor is not None:
+                    monitor.sample(checkpoint.date)
+                if not succeeded:
+                    time.sleep(10)  # 짧게 대기 후 체크포인트에서 재개
+            else:
+                logger.error("%s 실행 재시도 횟수 초과, 다음 실행 시간까지 대기", checkpoint.date)
         except Exception as e:
-            print(f"Error in main loop: {e}")
+            logger.exception("Error in main loop: %s", e)
             time.sleep(60)  # 오류 발생 시 1분 대기 후 재시도 
@@ -0,0 +1,165 @@
+"""분석/백테스트 결과 Parquet 내보내기 및 읽기
+
+MRHATradingSystem의 mrha_data, backtest_results, trades를 타입이 고정된 컬럼과
+심볼/인터벌/파라미터 메타데이터를 붙여 hive 방식으로 분할된 Parquet 파일에 씁니다.
+대시보드나 노트북은 다시 계산하지 않고 필요한 심볼/기간만 읽습니다.
+
+    <RESULT_EXPORT_DIR>/<테이블>/interval=<인터벌>/symbol=<심볼>/<실행 ID>-<파라미터 해시>.parquet
+
+  - 테이블: mrha(mrha_data), backtest(backtest_results), trades
+  - 모든 행에 run(실행 ID) 컬럼이 있어 같은 심볼의 여러 실행을 구분
+  - 파일 스키마 메타데이터 b'mrha': symbol, interval, params(get_params), backend,
+    run, exported_at, results(get_results)
+  - 읽기는 pyarrow.dataset + 메모리 맵(LocalFileSystem(use_mmap=True))으로, symbol/interval은
+    디렉터리 단위로, 기간(Date)은 row group 통계로 걸러 필요한 부분만 읽음
+
+pyarrow는 이 모듈을 쓸 때만 필요합니다 (pip install "pyarrow==17.*").
+
+사용 예:
+    export_results(bot, run_id="20240101")
+    read_results('trades', symbols=['KRW-BTC'], start='2024-01-01')
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+EXPORT_DIR = os.getenv('RESULT_EXPORT_DIR', 'results/parquet')
+METADATA_KEY = b'mrha'
+
+# 테이블별 시스템 속성과 컬럼 타입 (Signal/Position은 이벤트가 없는 봉이 null)
+TABLES = {
+    'mrha': ('mrha_data', {
+        'mh_open': 'float64', 'mh_high': 'float64', 'mh_low': 'float64', 'mh_close': 'float64',
+        'Ebr': 'float64', 'Btrg': 'float64', 'Ebl': 'float64', 'Strg': 'float64',
+        'Bullish_Target': 'float64', 'Bearish_Target': 'float64', 'Close_4_bars_ago': 'float64',
+        'TD_Buy_Setup': 'int8', 'TD_Sell_Setup': 'int8', 'Signal': 'Int8', 'Position': 'Int8',
+        'Entry_Price': 'float64', 'Exit_Price': 'float64',
+    }),
+    'backtest': ('backtest_results', {
+        'Holdings': 'float64', 'Cash': 'float64', 'Total_Value': 'float64', 'Returns': 'float64',
+    }),
+    'trades': ('trades', {
+        'Date': 'datetime64[ns]', 'Type': 'string', 'Price': 'float64', 'Shares': 'float64',
+    }),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def require_pyarrow():
+    """pyarrow 지연 로드 (선택 의존성)"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.fs
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("결과 내보내기에는 pyarrow가 필요합니다: pip install 'pyarrow==17.*'") from e
+    return pyarrow
+
+
+def params_hash(params):
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:10]
+
+
+def _typed_frame(frame, dtypes, run_id):
+    """컬럼 타입을 고정하고 봉 단위 테이블의 Date 인덱스는 컬럼으로 꺼냄 (object 컬럼 제거)"""
+    if frame is None or len(frame.columns) == 0:
+        frame = pd.DataFrame(columns=list(dtypes))
+    typed = pd.DataFrame(index=pd.RangeIndex(len(frame)))
+    if 'Date' not in dtypes:
+        typed['Date'] = pd.to_datetime(frame.index).astype('datetime64[ns]')
+    for column, dtype in dtypes.items():
+        values = frame[column]
+        if dtype in ('Int8', 'int8'):
+            # pandas 기준 구현의 Signal/Position은 object 컬럼
+            values = pd.to_numeric(values)
+        elif dtype.startswith('datetime'):
+            values = pd.to_datetime(values)
+        typed[column] = values.astype(dtype).array
+    typed['run'] = run_id
+    return typed
+
+
+def export_results(system, root=EXPORT_DIR, run_id=None, tables=tuple(TABLES)):
+    """시스템의 결과 DataFrame을 테이블별 Parquet 파일로 저장하고 경로 dict 반환"""
+    pa = require_pyarrow()
+    if system.mrha_data is None or system.backtest_results is None:
+        raise ValueError("run_analysis() must be run (with full backtest history) before export")
+    run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+    params = system.get_params()
+    metadata = json.dumps({
+        'symbol': system.symbol,
+        'interval': system.interval,
+        'params': params,
+        'backend': getattr(system, 'backend', 'pandas'),
+        'run': run_id,
+        'exported_at': datetime.now().isoformat(),
+        'results': system.get_results(),
+    }, ensure_ascii=False, default=str).encode('utf-8')
+
+    paths = {}
+    for table in tables:
+        attribute, dtypes = TABLES[table]
+        frame = _typed_frame(getattr(system, attribute), dtypes, run_id)
+        arrow_table = pa.Table.from_pandas(frame, preserve_index=False)
+        arrow_table = arrow_table.replace_schema_metadata(
+            {**(arrow_table.schema.metadata or {}), METADATA_KEY: metadata})
+        out_dir = os.path.join(root, table, f"interval={system.interval}", f"symbol={system.symbol}")
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{run_id}-{params_hash(params)}.parquet")
+        tmp_path = f"{path}.tmp"
+        pa.parquet.write_table(arrow_table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        paths[table] = path
+    return paths
+
+
+def open_dataset(table, root=EXPORT_DIR):
+    """테이블 전체를 메모리 맵 pyarrow Dataset으로 열기 (interval/symbol 파티션 컬럼 포함)"""
+    pa = require_pyarrow()
+    partitioning = pa.dataset.partitioning(
+        pa.schema([('interval', pa.string()), ('symbol', pa.string())]), flavor='hive')
+    return pa.dataset.dataset(os.path.join(root, table), format='parquet', partitioning=partitioning,
+                              filesystem=pa.fs.LocalFileSystem(use_mmap=True))
+
+
+def build_filter(symbols=None, intervals=None, start=None, end=None, runs=None):
+    """심볼/인터벌/실행 ID 목록과 [start, end) 기간으로 pyarrow 필터 식 생성 (조건이 없으면 None)"""
+    pa = require_pyarrow()
+    field = pa.dataset.field
+    conditions = []
+    if symbols is not None:
+        conditions.append(field('symbol').isin(list(symbols)))
+    if intervals is not None:
+        conditions.append(field('interval').isin(list(intervals)))
+    if runs is not None:
+        conditions.append(field('run').isin(list(runs)))
+    if start is not None:
+        conditions.append(field('Date') >= pa.scalar(pd.Timestamp(start).to_datetime64()))
+    if end is not None:
+        conditions.append(field('Date') < pa.scalar(pd.Timestamp(end).to_datetime64()))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_results(table, symbols=None, intervals=None, start=None, end=None, runs=None, columns=None,
+                 root=EXPORT_DIR):
+    """조건에 맞는 행만 읽어 DataFrame으로 반환"""
+    dataset = open_dataset(table, root)
+    expression = build_filter(symbols, intervals, start, end, runs)
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def read_metadata(path):
+    """내보낸 파일 1개의 메타데이터 dict (symbol, interval, params, backend, run, results ...)"""
+    pa = require_pyarrow()
+    metadata = pa.parquet.read_schema(path, memory_map=True).metadata or {}
+    return json.loads(metadata[METADATA_KEY]) if METADATA_KEY in metadata else {}
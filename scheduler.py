@@ -0,0 +1,118 @@
+"""캔들 경계에 맞춘 장중 멀티 인터벌 스케줄러
+
+minute60, minute15 등 설정한 인터벌의 캔들이 마감될 때마다(경계 + delay초)
+작업을 실행합니다. 각 사이클은 다음 캔들 전에 끝나야 하므로:
+  - 사이클마다 마감 시각(deadline = 경계 + 인터벌 x budget_fraction)을 작업에 전달
+  - 시작이 stale_fraction 이상 늦어진 사이클은 실행하지 않고 건너뜀
+  - 예산을 넘긴 사이클(overrun)은 감지해 Slack으로 알림
+"""
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from historical_loader import candle_start, interval_to_timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class CandleScheduler:
+    """캔들 마감마다 job(cycle_start, deadline)을 실행"""
+
+    def __init__(self, interval, job, delay_seconds=30, budget_fraction=0.8,
+                 stale_fraction=0.5, notifier=None, now=datetime.now, sleep=time.sleep):
+        self.interval = interval
+        self.delta = interval_to_timedelta(interval)
+        self.job = job
+        self.delay_seconds = delay_seconds
+        self.budget = self.delta * budget_fraction
+        self.stale_after = self.delta * stale_fraction
+        self.notifier = notifier
+        self.now = now
+        self.sleep = sleep
+        self.latencies = deque(maxlen=100)
+        self.overruns = 0
+        self.skipped = 0
+
+    def next_cycle(self, now=None):
+        """다음으로 실행할 사이클의 (새 캔들 시작 시각, 실행 시각)"""
+        now = now or self.now()
+        cycle = candle_start(self.interval, now)
+        run_at = cycle + self._delay()
+        if now >= run_at:
+            cycle += self.delta
+            run_at = cycle + self._delay()
+        return cycle, run_at
+
+    def _delay(self):
+        return timedelta(seconds=self.delay_seconds)
+
+    def _notify(self, title, message):
+        logger.warning("%s: %s", title, message)
+        if self.notifier is not None:
+            try:
+                self.notifier.notify_error(title, message)
+            except Exception as e:
+                logger.error("스케줄러 알림 실패: %s", e)
+
+    def run_cycle(self, cycle):
+        """사이클 1회 실행 (지연되었으면 건너뜀). 실행했으면 소요 시간(초) 반환"""
+        started = self.now()
+        lateness = started - cycle
+        if lateness > self.stale_after:
+            self.skipped += 1
+            self._notify("사이클 건너뜀",
+                         f"{self.interval} {cycle:%Y-%m-%d %H:%M} 캔들 사이클이 "
+                         f"{lateness.total_seconds():.0f}초 늦어 실행하지 않음")
+            return None
+
+        deadline = cycle + self.budget
+        try:
+            self.job(cycle, deadline)
+        except Exception as e:
+            self._notify("사이클 실패", f"{self.interval} {cycle:%Y-%m-%d %H:%M}: {e}")
+        finished = self.now()
+        elapsed = (finished - started).total_seconds()
+        self.latencies.append(elapsed)
+
+        if finished > deadline:
+            self.overruns += 1
+            self._notify("사이클 지연",
+                         f"{self.interval} {cycle:%Y-%m-%d %H:%M} 사이클 {elapsed:.1f}초 소요, "
+                         f"예산 {self.budget.total_seconds():.0f}초 초과 "
+                         f"(다음 캔들까지 {(cycle + self.delta - finished).total_seconds():.0f}초)")
+        else:
+            logger.info("%s %s 사이클 완료: %.1f초", self.interval, f"{cycle:%H:%M}", elapsed)
+        return elapsed
+
+    def run_forever(self, max_cycles=None):
+        cycles = 0
+        last_cycle = None
+        while max_cycles is None or cycles < max_cycles:
+            cycle, run_at = self.next_cycle()
+            if last_cycle is not None and cycle - last_cycle > self.delta:
+                # 이전 사이클이 길어져 실행 시점을 놓친 캔들
+                missed = int((cycle - last_cycle) / self.delta) - 1
+                self.skipped += missed
+                self._notify("사이클 건너뜀",
+                             f"{self.interval} 이전 사이클 지연으로 {missed}개 캔들 사이클 누락")
+            last_cycle = cycle
+            wait_seconds = (run_at - self.now()).total_seconds()
+            if wait_seconds > 0:
+                logger.info("다음 %s 사이클(%s)까지 %.0f초 대기", self.interval, f"{cycle:%H:%M}", wait_seconds)
+                self.sleep(wait_seconds)
+            self.run_cycle(cycle)
+            cycles += 1
+
+    def stats(self):
+        """최근 사이클 지연 통계"""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {'cycles': 0, 'overruns': self.overruns, 'skipped': self.skipped}
+        return {
+            'cycles': len(ordered),
+            'p50': ordered[len(ordered) // 2],
+            'max': ordered[-1],
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+        }
@@ -0,0 +1,108 @@
+"""MRHA 분석 결과 영구 캐시 (내용 주소 + 크기 제한 LRU)
+
+키는 (심볼, 인터벌, 마지막 봉 시각, 전략 파라미터)의 해시이고, 항목에는 입력
+데이터 해시가 함께 저장됩니다. 데이터를 이미 받았다면 data_hash까지 비교해
+정확히 같은 입력일 때만 재사용하고, 다운로드 없이 조회할 때는(대시보드, 같은
+날 재실행) 마지막 봉 시각만으로 조회합니다.
+
+항목은 <root>/<키 앞 2자>/<키>.pkl 파일이며, 조회 시 mtime을 갱신하고 전체
+크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(float(os.getenv('SIGNAL_CACHE_MAX_MB', 256)) * 1024 * 1024)
+
+
+def make_key(symbol, interval, last_bar, params):
+    payload = json.dumps([symbol, interval, pd.Timestamp(last_bar).isoformat(), params],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def data_hash(df):
+    """OHLCV DataFrame 내용 해시 (인덱스 포함)"""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+class SignalCache:
+    """분석 결과 디스크 캐시"""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or os.getenv('SIGNAL_CACHE_DIR', 'state/signal_cache')
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, symbol, interval, last_bar, params, data_hash=None):
+        """캐시 항목 조회. data_hash가 주어지면 입력 데이터까지 같을 때만 반환"""
+        path = self._path(make_key(symbol, interval, last_bar, params))
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("손상된 캐시 항목 삭제: %s (%s)", path, e)
+            os.remove(path)
+            return None
+        if data_hash is not None and entry.get('data_hash') != data_hash:
+            return None
+        os.utime(path)  # LRU 갱신
+        return entry
+
+    def put(self, symbol, interval, last_bar, params, data_hash, entry):
+        """캐시 항목 저장 후 크기 제한 적용"""
+        key = make_key(symbol, interval, last_bar, params)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = dict(entry, symbol=symbol, interval=interval, last_bar=pd.Timestamp(last_bar),
+                     params=params, data_hash=data_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+        return key
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith('.pkl'):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래된 항목 삭제"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    def clear(self):
+        for _, _, path in list(self._entries()):
+            os.remove(path)
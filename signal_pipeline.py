@@ -0,0 +1,150 @@
+"""분석 -> 게시 스트리밍 파이프라인
+
+여러 워커 스레드가 티커별 다운로드/MRHA 계산(produce)을 수행하고, 결과는
+크기 제한이 있는 큐를 통해 호출 스레드의 소비자에게 전달됩니다. 소비자는
+시그널이 준비되는 즉시 각 싱크(원장/Notion 미러, Slack, 체크포인트)에
+게시하므로, 뒤쪽 티커를 계산하는 동안 앞쪽 티커의 네트워크 I/O가 겹쳐
+진행됩니다. 싱크가 느리면 큐가 가득 차 워커가 기다립니다(backpressure).
+
+싱크는 begin(), publish(signal), end(signals) 메서드를 가진 객체입니다.
+"""
+import logging
+import queue
+import threading
+
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class SignalPipeline:
+    """produce(item) -> signal dict 를 병렬로 실행하며 결과를 즉시 싱크에 게시"""
+
+    def __init__(self, produce, sinks, workers=3, queue_size=8):
+        self.produce = produce
+        self.sinks = sinks
+        self.workers = workers
+        self.queue_size = queue_size
+
+    def _worker(self, tasks, results):
+        while True:
+            try:
+                item = tasks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                signal = self.produce(item)
+            except Exception as e:
+                logger.error("파이프라인 작업 실패 (%s): %s", item, e)
+                signal = None
+            results.put(signal)
+
+    def _call_sinks(self, method, *args):
+        for sink in self.sinks:
+            try:
+                getattr(sink, method)(*args)
+            except Exception as e:
+                logger.error("%s.%s 실패: %s", type(sink).__name__, method, e)
+
+    def run(self, items):
+        """모든 item을 처리하고 게시된 시그널 목록(완료 순서) 반환"""
+        tasks = queue.Queue()
+        for item in items:
+            tasks.put(item)
+        results = queue.Queue(maxsize=self.queue_size)
+
+        threads = [threading.Thread(target=self._worker, args=(tasks, results), daemon=True)
+                   for _ in range(min(self.workers, max(len(items), 1)))]
+        for thread in threads:
+            thread.start()
+
+        def close_when_done():
+            for thread in threads:
+                thread.join()
+            results.put(_DONE)
+
+        threading.Thread(target=close_when_done, daemon=True).start()
+
+        self._call_sinks('begin')
+        published = []
+        while True:
+            signal = results.get()
+            if signal is _DONE:
+                break
+            if signal is None:
+                continue
+            with span('publish', ticker=signal['ticker']):
+                self._call_sinks('publish', signal)
+            published.append(signal)
+        self._call_sinks('end', published)
+        return published
+
+
+class LedgerSink:
+    """로컬 원장에 시그널 기록 후 Notion 미러에 전달"""
+
+    def __init__(self, state_store, notion_mirror, date):
+        self.store = state_store
+        self.mirror = notion_mirror
+        self.date = date
+
+    def begin(self):
+        self.store.clear_daily_signals(self.date)
+        self.mirror.clear_daily_signals()
+
+    def publish(self, signal):
+        row = self.store.add_signal(self.date, signal)
+        self.mirror.add_daily_signal(row)
+
+    def end(self, signals):
+        pass
+
+
+class SlackSink:
+    """시그널이 준비될 때마다 Slack 알림, 마지막에 요약 전송"""
+
+    _ICONS = {'BUY': '🟢', 'SELL': '🔴', 'HOLD': '⚪'}
+
+    def __init__(self, slack, per_signal=True):
+        self.slack = slack
+        self.per_signal = per_signal
+
+    def begin(self):
+        pass
+
+    def publish(self, signal):
+        if self.per_signal:
+            self.slack.send_notification(
+                f"{self._ICONS.get(signal['signal'], '')} {signal['ticker']}: {signal['signal']} "
+                f"(순위 {signal['rank']})")
+
+    def end(self, signals):
+        summary = {'BUY': [], 'SELL': [], 'HOLD': []}
+        for signal in signals:
+            summary[signal['signal']].append(signal['ticker'])
+        self.slack.send_notification(f"""
+📈 MRHA 시그널 생성 완료
+BUY: {', '.join(summary['BUY']) if summary['BUY'] else '없음'}
+SELL: {', '.join(summary['SELL']) if summary['SELL'] else '없음'}
+HOLD: {', '.join(summary['HOLD']) if summary['HOLD'] else '없음'}
+""")
+
+
+class CheckpointSink:
+    """게시된 시그널을 티커별 체크포인트에 기록 (소비자 스레드에서만 쓰므로 경합 없음)"""
+
+    def __init__(self, checkpoint, computed):
+        self.checkpoint = checkpoint
+        self.computed = computed
+
+    def begin(self):
+        pass
+
+    def publish(self, signal):
+        self.computed[f"KRW-{signal['ticker']}"] = signal
+        self.checkpoint.save('signals', self.computed)
+
+    def end(self, signals):
+        pass
@@ -0,0 +1,434 @@
+"""업비트/Notion/Slack 로컬 시뮬레이터 (오프라인 부하 테스트)
+
+run_trading_system 전체 흐름을 실제 API 없이 실행합니다.
+  - SimExchange: 합성 마켓의 티커/캔들/현재가와 주문·잔고를 흉내 내는 업비트 REST
+  - FakeNotionClient: databases.query / pages.create / pages.update 인메모리 DB
+  - FakeSlackClient: chat_postMessage 기록
+  - VirtualClock: time.sleep/time.time/time.monotonic과 각 모듈의 datetime.now를
+    가상 시계로 교체. 메인 스레드의 sleep은 기다리지 않고 시계만 앞당기며,
+    백그라운드 스레드(Notion 미러 등)의 sleep은 즉시 반환합니다.
+
+상태 파일(원장, 체크포인트, 캐시, 트레이스)은 임시 작업 디렉터리에 만들어지므로
+실제 state/와 섞이지 않습니다.
+
+사용 예:
+    python sim_harness.py --markets 500                       # 09:01 일일 실행 1회
+    python sim_harness.py --markets 500 --interval minute60 --cycles 24
+"""
+import argparse
+import itertools
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FEE = 0.0005  # 업비트 KRW 마켓 수수료
+HISTORY_BARS = 400  # 시뮬레이션 시작 전 생성할 캔들 수
+
+
+class VirtualClock:
+    """실제 경과 시간 + sleep으로 건너뛴 시간으로 진행하는 가상 시계"""
+
+    def __init__(self, start):
+        self.start = start
+        self._offset = 0.0
+        self._real_monotonic = time.monotonic
+        self._real_sleep = time.sleep
+        self._origin = self._real_monotonic()
+        self._lock = threading.Lock()
+
+    def elapsed(self):
+        return self._real_monotonic() - self._origin + self._offset
+
+    def now(self):
+        return self.start + timedelta(seconds=self.elapsed())
+
+    def time(self):
+        return self.start.timestamp() + self.elapsed()
+
+    def monotonic(self):
+        return self.elapsed()
+
+    def sleep(self, seconds):
+        if threading.current_thread() is threading.main_thread():
+            with self._lock:
+                self._offset += max(seconds, 0)
+        else:
+            self._real_sleep(0)
+
+    def datetime_class(self):
+        """now()가 가상 시각을 돌려주는 datetime 서브클래스"""
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now() if tz is None else clock.now().astimezone(tz)
+
+        return VirtualDatetime
+
+
+class SimAccount:
+    """pyupbit.Upbit 대역 (시장가 주문은 fill_delay초 뒤 체결)"""
+
+    def __init__(self, exchange, krw, fill_delay=0.3):
+        self.exchange = exchange
+        self.krw = krw
+        self.fill_delay = fill_delay
+        self.holdings = {}  # currency -> [balance, avg_buy_price]
+        self.orders = {}
+        self._lock = threading.Lock()
+
+    def get_balances(self):
+        self.exchange.call()
+        with self._lock:
+            balances = [{'currency': 'KRW', 'balance': str(self.krw), 'locked': '0',
+                         'avg_buy_price': '0', 'unit_currency': 'KRW'}]
+            for currency, (balance, avg_price) in self.holdings.items():
+                if balance > 0:
+                    balances.append({'currency': currency, 'balance': str(balance), 'locked': '0',
+                                     'avg_buy_price': str(avg_price), 'unit_currency': 'KRW'})
+        return balances
+
+    def get_balance(self, ticker="KRW"):
+        self.exchange.call()
+        with self._lock:
+            if ticker == "KRW":
+                return self.krw
+            return self.holdings.get(ticker.replace('KRW-', ''), [0.0, 0.0])[0]
+
+    def _order(self, ticker, side, **fields):
+        order = {'uuid': str(uuid.uuid4()), 'side': side, 'market': ticker,
+                 'created_at': self.exchange.clock.now().isoformat(), 'state': 'wait',
+                 'executed_volume': '0', 'trades_count': 0, **fields}
+        self.orders[order['uuid']] = (self.exchange.clock.monotonic() + self.fill_delay, order)
+        return dict(order)
+
+    def buy_market_order(self, ticker, price):
+        self.exchange.call()
+        currency = ticker.replace('KRW-', '')
+        with self._lock:
+            if price > self.krw:
+                return {'error': {'name': 'insufficient_funds_bid'}}
+            current = self.exchange.current_price(ticker)
+            volume = price * (1 - FEE) / current
+            balance, avg_price = self.holdings.get(currency, [0.0, 0.0])
+            self.holdings[currency] = [balance + volume,
+                                       (balance * avg_price + volume * current) / (balance + volume)]
+            self.krw -= price
+            return self._order(ticker, 'bid', ord_type='price', price=str(price),
+                               fill_volume=volume)
+
+    def sell_market_order(self, ticker, volume):
+        self.exchange.call()
+        currency = ticker.replace('KRW-', '')
+        with self._lock:
+            balance, avg_price = self.holdings.get(currency, [0.0, 0.0])
+            if volume > balance:
+                return {'error': {'name': 'insufficient_funds_ask'}}
+            self.holdings[currency] = [balance - volume, avg_price]
+            self.krw += volume * self.exchange.current_price(ticker) * (1 - FEE)
+            return self._order(ticker, 'ask', ord_type='market', volume=str(volume),
+                               fill_volume=volume)
+
+    def get_order(self, ticker_or_uuid, *args, **kwargs):
+        self.exchange.call()
+        with self._lock:
+            fill_at, order = self.orders[ticker_or_uuid]
+            if order['state'] == 'wait' and self.exchange.clock.monotonic() >= fill_at:
+                order.update(state='done', executed_volume=str(order['fill_volume']), trades_count=1)
+            return dict(order)
+
+
+class SimExchange:
+    """합성 마켓 업비트 REST 대역 (pyupbit 모듈 자리에 그대로 넣어 사용)"""
+
+    def __init__(self, clock, markets=500, seed=0, krw=10000000, owned=5, latency=0.0, fill_delay=0.3):
+        self.clock = clock
+        self.tickers = [f"KRW-S{i:03d}" for i in range(markets)]
+        self.seed = seed
+        self.latency = latency
+        self.calls = itertools.count()
+        self._series = {}
+        self._lock = threading.Lock()
+        self.account = SimAccount(self, krw, fill_delay)
+        # 시작 보유 코인 (SELL 시그널이 나올 수 있도록)
+        rng = np.random.default_rng(seed)
+        for ticker in rng.choice(self.tickers, size=min(owned, markets), replace=False):
+            price = self.current_price(ticker)
+            self.account.holdings[ticker.replace('KRW-', '')] = [1000000 / price, price]
+
+    def call(self):
+        """API 호출 1회 (latency초 소요)"""
+        next(self.calls)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def series(self, ticker, interval):
+        """(ticker, interval)의 합성 캔들 전체 (시뮬레이션 시작 전 HISTORY_BARS개 + 이후 하루치)"""
+        from historical_loader import candle_start, interval_to_timedelta
+
+        key = (ticker, interval)
+        with self._lock:
+            if key not in self._series:
+                delta = interval_to_timedelta(interval)
+                bars = HISTORY_BARS + int(timedelta(days=2) / delta) + 1
+                first = candle_start(interval, self.clock.start) - delta * HISTORY_BARS
+                # 가격 수준은 티커별로 같고, 인터벌별 경로만 다름
+                base = np.random.default_rng(zlib.crc32(f"{self.seed}:{ticker}".encode())).uniform(100, 100000)
+                rng = np.random.default_rng(zlib.crc32(f"{self.seed}:{ticker}:{interval}".encode()))
+                scale = np.sqrt(delta / timedelta(days=1))
+                close = base * np.exp(np.cumsum(rng.normal(0, 0.04 * scale, bars)))
+                open_ = np.concatenate([[close[0]], close[:-1]])
+                spread = np.abs(rng.normal(0, 0.02 * scale, bars))
+                volume = rng.lognormal(np.log(rng.uniform(1e3, 1e6)), 0.5, bars) * scale
+                index = pd.date_range(first, periods=bars, freq=delta)
+                self._series[key] = pd.DataFrame({
+                    'open': open_,
+                    'high': np.maximum(open_, close) * (1 + spread),
+                    'low': np.minimum(open_, close) * (1 - spread),
+                    'close': close,
+                    'volume': volume,
+                    'value': volume * close,
+                }, index=index)
+            return self._series[key]
+
+    # --- pyupbit 함수 ---
+    def get_tickers(self, fiat="KRW", **kwargs):
+        self.call()
+        return list(self.tickers)
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None, period=0.1):
+        """현재 진행 중인 캔들까지 포함한 최근 count개 (pyupbit와 동일한 컬럼)"""
+        self.call()
+        df = self.series(ticker, interval)
+        end = pd.Timestamp(to) if to is not None else pd.Timestamp(self.clock.now())
+        return df[df.index <= end].tail(count).copy()
+
+    def current_price(self, ticker):
+        df = self.series(ticker, "minute1")
+        return float(df['close'][df.index <= pd.Timestamp(self.clock.now())].iloc[-1])
+
+    def get_current_price(self, ticker="KRW-BTC", **kwargs):
+        self.call()
+        return self.current_price(ticker)
+
+    def Upbit(self, access=None, secret=None):
+        return self.account
+
+
+class _Endpoint:
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+class FakeNotionClient:
+    """notion_client.Client 대역 (페이지를 메모리에 보관)"""
+
+    pages_by_id = {}
+
+    def __init__(self, auth=None, **kwargs):
+        self.databases = _Endpoint(query=self._query)
+        self.pages = _Endpoint(create=self._create, update=self._update)
+        self._lock = threading.Lock()
+
+    def _query(self, database_id, filter=None, **kwargs):
+        with self._lock:
+            results = [page for page in self.pages_by_id.values()
+                       if page['parent'].get('database_id') == database_id and not page['archived']]
+        if filter and 'select' in filter:
+            wanted = filter['select'].get('equals')
+            results = [page for page in results
+                       if (page['properties'].get(filter['property'], {}).get('select') or {}).get('name') == wanted]
+        return {'results': results, 'has_more': False, 'next_cursor': None}
+
+    def _create(self, parent, properties, **kwargs):
+        page = {'id': str(uuid.uuid4()), 'parent': parent, 'properties': properties, 'archived': False}
+        with self._lock:
+            self.pages_by_id[page['id']] = page
+        return page
+
+    def _update(self, page_id, archived=None, properties=None, **kwargs):
+        with self._lock:
+            page = self.pages_by_id[page_id]
+            if archived is not None:
+                page['archived'] = archived
+            if properties:
+                page['properties'].update(properties)
+        return page
+
+
+class FakeSlackClient:
+    """slack_sdk.WebClient 대역 (전송한 메시지를 기록)"""
+
+    messages = []
+
+    def __init__(self, token=None, **kwargs):
+        pass
+
+    def chat_postMessage(self, channel=None, text=None, **kwargs):
+        self.messages.append({'channel': channel, 'text': text})
+        return {'ok': True}
+
+
+class Simulation:
+    """가짜 API와 가상 시계를 설치한 상태에서 트레이더를 실행하는 컨텍스트"""
+
+    def __init__(self, start, markets=500, seed=0, latency=0.0, fill_delay=0.3, workdir=None):
+        self.clock = VirtualClock(start)
+        self.exchange = SimExchange(self.clock, markets=markets, seed=seed, latency=latency,
+                                    fill_delay=fill_delay)
+        self.workdir = workdir
+        self._patches = []
+        self._tempdir = None
+        self._cwd = None
+
+    def _patch(self, obj, name, value):
+        self._patches.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def _setenv(self, name, value):
+        self._patches.append((os.environ, name, os.environ.get(name)))
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+    def __enter__(self):
+        # 작업 디렉터리를 옮기기 전에 import (sys.path에 ''가 있는 경우)
+        import checkpoint
+        import class_mrha
+        import historical_loader
+        import notion_manager
+        import realtime_trader
+        import slack_notifier
+        import state_store
+
+        # 상대 경로 상태 파일(state/...)이 임시 디렉터리에 만들어지도록 이동
+        if self.workdir is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix='mrha-sim-')
+            self.workdir = self._tempdir.name
+        self._cwd = os.getcwd()
+        os.chdir(self.workdir)
+        for name in ('STATE_DB_PATH', 'SIGNAL_CACHE_DIR'):
+            self._setenv(name, None)
+        for name in ('NOTION_TOKEN', 'DAILY_SIGNALS_DB_ID', 'PORTFOLIO_DB_ID', 'SLACK_BOT_TOKEN',
+                     'SLACK_CHANNEL', 'UPBIT_ACCESS_KEY', 'UPBIT_SECRET_KEY'):
+            self._setenv(name, f"sim-{name.lower()}")
+
+        FakeNotionClient.pages_by_id = {}
+        FakeSlackClient.messages = []
+        virtual_datetime = self.clock.datetime_class()
+        for module in (realtime_trader, class_mrha):
+            self._patch(module, 'pyupbit', self.exchange)
+        self._patch(notion_manager, 'Client', FakeNotionClient)
+        self._patch(slack_notifier, 'WebClient', FakeSlackClient)
+        for module in (realtime_trader, checkpoint, historical_loader, notion_manager,
+                       slack_notifier, state_store):
+            self._patch(module, 'datetime', virtual_datetime)
+        self._patch(time, 'sleep', self.clock.sleep)
+        self._patch(time, 'time', self.clock.time)
+        self._patch(time, 'monotonic', self.clock.monotonic)
+        return self
+
+    def __exit__(self, *exc):
+        for obj, name, value in reversed(self._patches):
+            if obj is os.environ:
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            else:
+                setattr(obj, name, value)
+        self._patches = []
+        os.chdir(self._cwd)
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+        return False
+
+    def report(self, real_seconds, runs):
+        import state_store
+
+        store = state_store.StateStore()
+        executions = store.get_executions()
+        signals = store.get_signals()
+        store.close()
+        return {
+            'runs': runs,
+            'markets': len(self.exchange.tickers),
+            'real_seconds': real_seconds,
+            'virtual_seconds': self.clock.elapsed(),
+            'api_calls': next(self.exchange.calls),
+            'signals': len(signals),
+            'executions': len(executions),
+            'notion_pages': len(FakeNotionClient.pages_by_id),
+            'slack_messages': len(FakeSlackClient.messages),
+            'krw': self.exchange.account.krw,
+        }
+
+
+def simulate(markets=500, interval="day", cycles=1, start=None, seed=0, latency=0.0,
+             fill_delay=0.3, pipelined=False, workdir=None):
+    """시뮬레이션 실행 후 요약 dict 반환 (일봉은 09:01 실행 1회, 분봉은 cycles개 사이클)"""
+    import realtime_trader
+    from scheduler import CandleScheduler
+
+    if start is None:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today + timedelta(hours=9, minutes=1) if interval == "day" else today + timedelta(hours=9)
+    with Simulation(start, markets, seed, latency, fill_delay, workdir) as sim:
+        services = realtime_trader.create_services()
+        started = time.perf_counter()
+        if interval == "day":
+            realtime_trader.run_trading_system(resume=False, services=services, pipelined=pipelined)
+            runs = 1
+        else:
+            def job(cycle, deadline):
+                realtime_trader.run_trading_system(resume=True, interval=interval, cycle_start=cycle,
+                                                   deadline=deadline, pipelined=pipelined,
+                                                   services=services)
+
+            scheduler = CandleScheduler(interval, job, now=sim.clock.now, sleep=sim.clock.sleep)
+            scheduler.run_forever(max_cycles=cycles)
+            runs = cycles
+        services['notion_manager'].flush(timeout=60)
+        report = sim.report(time.perf_counter() - started, runs)
+        realtime_trader.close_services(services)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트/Notion/Slack 시뮬레이터로 트레이더 부하 테스트")
+    parser.add_argument("--markets", type=int, default=500)
+    parser.add_argument("--interval", default="day")
+    parser.add_argument("--cycles", type=int, default=24, help="분봉 모드에서 실행할 사이클 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="API 호출당 가상 지연(초)")
+    parser.add_argument("--fill-delay", type=float, default=0.3, help="주문 체결까지 가상 지연(초)")
+    parser.add_argument("--pipelined", action="store_true")
+    args = parser.parse_args()
+
+    from log_config import setup_logging
+    setup_logging(level=os.getenv('LOG_LEVEL', 'WARNING'))
+
+    report = simulate(markets=args.markets, interval=args.interval,
+                      cycles=args.cycles if args.interval != "day" else 1, seed=args.seed,
+                      latency=args.latency, fill_delay=args.fill_delay, pipelined=args.pipelined)
+    print(f"{report['markets']}개 마켓, {report['runs']}회 실행: "
+          f"실제 {report['real_seconds']:.1f}초 / 가상 {report['virtual_seconds'] / 3600:.2f}시간")
+    print(f"API 호출 {report['api_calls']}회, 시그널 {report['signals']}개, 체결 {report['executions']}건, "
+          f"Notion 페이지 {report['notion_pages']}개, Slack 메시지 {report['slack_messages']}개")
+    print(f"최종 KRW 잔고: {report['krw']:,.0f}원")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import logging
 from dotenv import load_dotenv
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
@@ -7,31 +8,33 @@ from datetime import datetime
 # .env 파일 로드
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class SlackNotifier:
     def __init__(self):
         self.client = WebClient(token=os.getenv('SLACK_BOT_TOKEN'))
         self.channel = os.getenv('SLACK_CHANNEL')
-        print(f"SlackNotifier 초기화: 채널={self.channel}")
+        logger.info("SlackNotifier 초기화: 채널=%s", self.channel)
         
     def send_notification(self, message):
         """기본 Slack 메시지 전송"""
         try:
-            print(f"Slack 메시지 전송 시도: {message[:50]}...")
+            logger.debug("Slack 메시지 전송 시도: %s...", message[:50])
             response = self.client.chat_postMessage(
                 channel=self.channel,
                 text=message
             )
             if response["ok"]:
-                print("Slack 메시지 전송 성공!")
+                logger.info("Slack 메시지 전송 성공")
                 return True
             else:
-                print(f"Slack 메시지 전송 실패: {response.get('error', '알 수 없는 에러')}")
+                logger.error("Slack 메시지 전송 실패: %s", response.get('error', '알 수 없는 에러'))
                 return False
         except SlackApiError as e:
-            print(f"Slack API 에러: {e.response['error']}")
+            logger.error("Slack API 에러: %s", e.response['error'])
             return False
         except Exception as e:
-            print(f"Slack 메시지 전송 중 예상치 못한 에러: {str(e)}")
+            logger.exception("Slack 메시지 전송 중 예상치 못한 에러: %s", e)
             return False
             
     def notify_signal_execution(self, execution_type, data):
@@ -48,7 +51,7 @@ class SlackNotifier:
                 
             return self.send_notification(message)
         except Exception as e:
-            print(f"Error sending execution notification: {e}")
+            logger.error("Error sending execution notification: %s", e)
             return False
             
     def _format_sell_notification(self, data):
@@ -0,0 +1,297 @@
+"""로컬 SQLite(WAL) 원장과 Notion 비동기 미러
+
+시그널, 체결, 포트폴리오 스냅샷은 로컬 SQLite에 먼저 기록되고 조회도 여기서
+합니다. Notion은 NotionMirror가 백그라운드 스레드에서 뒤따라 반영하는
+미러일 뿐이므로, 시그널 실행 단계는 Notion 왕복을 기다리지 않습니다.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# SQLite 페이지 캐시 상한 (KB)
+STATE_DB_CACHE_KB = int(os.getenv('STATE_DB_CACHE_KB', 2048))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    rank INTEGER,
+    trading_value REAL,
+    signal TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    error_message TEXT DEFAULT '',
+    retry_count INTEGER DEFAULT 0,
+    execution_time TEXT,
+    notion_page_id TEXT,
+    created_at TEXT NOT NULL,
+    UNIQUE (date, ticker)
+);
+CREATE INDEX IF NOT EXISTS idx_signals_date ON signals (date);
+CREATE INDEX IF NOT EXISTS idx_signals_ticker ON signals (ticker, date);
+CREATE INDEX IF NOT EXISTS idx_signals_status ON signals (status, date);
+
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    signal_id INTEGER REFERENCES signals (id),
+    date TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    side TEXT NOT NULL,
+    amount REAL,
+    krw_amount REAL,
+    order_uuid TEXT,
+    executed_at TEXT NOT NULL,
+    raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_executions_date ON executions (date);
+CREATE INDEX IF NOT EXISTS idx_executions_ticker ON executions (ticker, date);
+CREATE INDEX IF NOT EXISTS idx_executions_signal ON executions (signal_id);
+
+CREATE TABLE IF NOT EXISTS portfolio_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at TEXT NOT NULL,
+    date TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    amount REAL,
+    avg_price REAL,
+    current_price REAL,
+    total_value REAL
+);
+CREATE INDEX IF NOT EXISTS idx_portfolio_date ON portfolio_snapshots (date, taken_at);
+CREATE INDEX IF NOT EXISTS idx_portfolio_ticker ON portfolio_snapshots (ticker, date);
+"""
+
+
+class StateStore:
+    """트레이딩 시스템 주 원장 (SQLite, WAL 모드)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('STATE_DB_PATH', 'state/trading.db')
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA cache_size=-{STATE_DB_CACHE_KB}")
+        self.conn.executescript(_SCHEMA)
+        self.lock = threading.Lock()
+
+    def _execute(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    # --- 시그널 ---
+    def _clear_signals(self, date):
+        # 체결 기록이 있는 시그널은 남겨 둠
+        self.conn.execute("DELETE FROM signals WHERE date = ? AND id NOT IN "
+                          "(SELECT signal_id FROM executions WHERE signal_id IS NOT NULL)", (date,))
+
+    def _insert_signal(self, date, signal, now):
+        self.conn.execute(
+            "INSERT INTO signals (date, ticker, rank, trading_value, signal, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            # 이미 체결 기록이 있는 시그널은 상태를 유지 (재실행 시 중복 주문 방지)
+            "ON CONFLICT (date, ticker) DO UPDATE SET rank = excluded.rank, "
+            "trading_value = excluded.trading_value",
+            (date, signal['ticker'], signal['rank'], signal['trading_value'],
+             signal['signal'], signal.get('status', 'PENDING'), now))
+
+    def replace_daily_signals(self, date, signals_data):
+        """해당 날짜의 시그널을 새 목록으로 교체하고 저장된 행 목록 반환"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self._clear_signals(date)
+                for signal in signals_data:
+                    self._insert_signal(date, signal, now)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return self.get_signals(date=date)
+
+    def clear_daily_signals(self, date):
+        """스트리밍 게시 시작 전 해당 날짜의 미체결 시그널 삭제"""
+        with self.lock:
+            self._clear_signals(date)
+
+    def add_signal(self, date, signal):
+        """시그널 1개 추가 후 저장된 행 반환"""
+        with self.lock:
+            self._insert_signal(date, signal, datetime.now().isoformat())
+        return self.get_signals(date=date, ticker=signal['ticker'])[0]
+
+    def get_signals(self, date=None, ticker=None, status=None):
+        """날짜/티커/상태로 시그널 조회 (순위 순)"""
+        clauses, params = [], []
+        for column, value in (('date', date), ('ticker', ticker), ('status', status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"SELECT * FROM signals{where} ORDER BY date, rank", params)
+
+    def get_pending_signals(self, date=None):
+        return self.get_signals(date=date, status='PENDING')
+
+    def get_signal(self, signal_id):
+        rows = self._query("SELECT * FROM signals WHERE id = ?", (signal_id,))
+        return rows[0] if rows else None
+
+    def update_signal_status(self, signal_id, status, error_message=None):
+        self._execute(
+            "UPDATE signals SET status = ?, execution_time = ?, "
+            "error_message = COALESCE(?, error_message), "
+            "retry_count = retry_count + CASE WHEN ? = 'FAILED' THEN 1 ELSE 0 END "
+            "WHERE id = ?",
+            (status, datetime.now().isoformat(), error_message, status, signal_id))
+        return True
+
+    def set_notion_page_id(self, signal_id, page_id):
+        self._execute("UPDATE signals SET notion_page_id = ? WHERE id = ?", (page_id, signal_id))
+
+    # --- 체결 ---
+    def record_execution(self, signal_id, ticker, side, amount=None, krw_amount=None, order=None):
+        """주문 결과 기록 (order는 업비트 주문 응답 dict)"""
+        now = datetime.now()
+        self._execute(
+            "INSERT INTO executions (signal_id, date, ticker, side, amount, krw_amount, order_uuid, executed_at, raw) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (signal_id, now.strftime('%Y-%m-%d'), ticker, side, amount, krw_amount,
+             order.get('uuid') if isinstance(order, dict) else None, now.isoformat(),
+             json.dumps(order, default=str) if order is not None else None))
+
+    def get_executions(self, date=None, ticker=None, signal_id=None):
+        """체결 기록 조회 (date는 체결 일자, 실행 키와 다를 수 있으므로 시그널은 signal_id로 조회)"""
+        clauses, params = [], []
+        for column, value in (('date', date), ('ticker', ticker), ('signal_id', signal_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"SELECT * FROM executions{where} ORDER BY executed_at", params)
+
+    # --- 포트폴리오 ---
+    def record_portfolio(self, portfolio_data):
+        """포트폴리오 스냅샷 기록 (update_portfolio_db와 같은 형식)"""
+        now = datetime.now()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT INTO portfolio_snapshots (taken_at, date, ticker, amount, avg_price, current_price, total_value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(now.isoformat(), now.strftime('%Y-%m-%d'), p['ticker'], p['amount'], p['avg_price'],
+                  p['current_price'], p['total_value']) for p in portfolio_data])
+            self.conn.execute("COMMIT")
+
+    def latest_portfolio(self):
+        return self._query(
+            "SELECT ticker, amount, avg_price, current_price, total_value FROM portfolio_snapshots "
+            "WHERE taken_at = (SELECT MAX(taken_at) FROM portfolio_snapshots)")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class NotionMirror:
+    """NotionManager 호출을 큐에 넣어 백그라운드에서 순서대로 반영
+
+    트레이더가 쓰는 NotionManager 메서드와 같은 이름을 제공하며, 모두 즉시 반환합니다.
+    update_signal_status는 로컬 시그널 id를 받아 Notion 페이지 id로 변환합니다.
+    """
+
+    def __init__(self, notion_manager, state_store, maxsize=1000):
+        self.notion = notion_manager
+        self.store = state_store
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def update_daily_signals(self, signals_data):
+        self.queue.put(('signals', [dict(s) for s in signals_data]))
+        return True
+
+    def clear_daily_signals(self):
+        self.queue.put(('clear', None))
+        return True
+
+    def add_daily_signal(self, signal):
+        self.queue.put(('signal', dict(signal)))
+        return True
+
+    def update_signal_status(self, signal_id, status, execution_data=None):
+        self.queue.put(('status', (signal_id, status)))
+        return True
+
+    def update_portfolio(self, portfolio_data):
+        self.queue.put(('portfolio', list(portfolio_data)))
+        return True
+
+    def flush(self, timeout=None):
+        """대기 중인 미러 작업이 모두 끝날 때까지 대기"""
+        if timeout is None:
+            self.queue.join()
+            return True
+        deadline = threading.Event()
+        waiter = threading.Thread(target=lambda: (self.queue.join(), deadline.set()), daemon=True)
+        waiter.start()
+        return deadline.wait(timeout)
+
+    def pending(self):
+        """아직 반영되지 않은 미러 작업 수 (처리 중인 작업 포함)"""
+        return self.queue.unfinished_tasks
+
+    def close(self, timeout=None):
+        """대기 중인 작업을 반영한 뒤 백그라운드 스레드 종료 (timeout 안에 끝나면 True)"""
+        self.queue.put(('stop', None))
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def _run(self):
+        while True:
+            kind, payload = self.queue.get()
+            if kind == 'stop':
+                self.queue.task_done()
+                return
+            try:
+                if kind == 'signals':
+                    with span('notion_publish', count=len(payload)):
+                        self.notion.update_daily_signals(payload)
+                    for signal in payload:
+                        if signal.get('notion_page_id') and signal.get('id') is not None:
+                            self.store.set_notion_page_id(signal['id'], signal['notion_page_id'])
+                elif kind == 'clear':
+                    self.notion.clear_daily_signals()
+                elif kind == 'signal':
+                    with span('notion_publish', ticker=payload.get('ticker')):
+                        page_id = self.notion.add_daily_signal(payload)
+                    if payload.get('id') is not None:
+                        self.store.set_notion_page_id(payload['id'], page_id)
+                elif kind == 'status':
+                    signal_id, status = payload
+                    row = self.store.get_signal(signal_id)
+                    if row and row['notion_page_id']:
+                        self.notion.update_signal_status(row['notion_page_id'], status)
+                    else:
+                        logger.warning("Notion 페이지 없음, 상태 미러 생략: signal_id=%s", signal_id)
+                elif kind == 'portfolio':
+                    self.notion.update_portfolio(payload)
+            except Exception as e:
+                logger.error("Notion 미러 작업 실패 (%s): %s", kind, e)
+            finally:
+                self.queue.task_done()
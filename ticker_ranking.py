@@ -0,0 +1,230 @@
+"""실시간 티커 스트림 기반 거래대금 순위
+
+업비트 ticker 웹소켓(또는 기록된 로컬 피드)에서 KRW 마켓의 24시간 누적
+거래대금(acc_trade_price_24h)을 받아 정렬 상태로 유지합니다. 시그널 생성
+시점의 유니버스 선정은 전 마켓 폴링 없이 메모리 조회로 끝납니다.
+
+피드는 {'code': 'KRW-BTC', 'acc_trade_price_24h': ..., 'timestamp': ...}
+형태의 dict를 내보내는 이터러블이면 무엇이든 됩니다. {'type': 'listing', 'codes': [...]}
+메시지는 현재 상장 목록으로, 목록에 없는(상장 폐지된) 티커를 순위에서 제거합니다.
+상장 목록의 RANKING_MIN_COVERAGE 이상을 수신하기 전에는 순위를 쓰지 않습니다(is_fresh).
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+import pyupbit
+
+logger = logging.getLogger(__name__)
+
+# 웹소켓 피드가 KRW 마켓 목록을 다시 조회하는 주기 (초, 신규 상장/상장 폐지 반영)
+TICKER_REFRESH_SECONDS = float(os.getenv('TICKER_REFRESH_SECONDS', 3600))
+# pyupbit WebSocketManager가 연결이 끊겼을 때 큐에 넣는 값 (내부에서 자동 재연결)
+CONNECTION_CLOSED = 'ConnectionClosedError'
+# 순위를 쓰려면 상장 목록 중 이 비율 이상의 마켓을 수신했어야 함
+RANKING_MIN_COVERAGE = float(os.getenv('RANKING_MIN_COVERAGE', 0.95))
+
+
+class TradingValueRanking:
+    """거래대금 내림차순으로 정렬된 티커 목록 (갱신 O(log n) 탐색 + 삽입)"""
+
+    def __init__(self):
+        self._values = {}
+        self._sorted = []  # (-trading_value, ticker)
+        self._listed = None  # 마지막 listing 메시지의 상장 목록
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_update = None
+
+    def update(self, ticker, trading_value):
+        """티커 1개의 누적 거래대금 갱신"""
+        trading_value = float(trading_value)
+        with self._lock:
+            old = self._values.get(ticker)
+            if old is not None:
+                if old == trading_value:
+                    self.last_update = time.time()
+                    return
+                pos = bisect.bisect_left(self._sorted, (-old, ticker))
+                del self._sorted[pos]
+            self._values[ticker] = trading_value
+            bisect.insort(self._sorted, (-trading_value, ticker))
+            self.last_update = time.time()
+
+    def remove(self, ticker):
+        """상장 폐지 등으로 사라진 티커 제거"""
+        with self._lock:
+            old = self._values.pop(ticker, None)
+            if old is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, (-old, ticker))]
+
+    def retain(self, tickers):
+        """tickers(현재 상장 목록)에 없는 티커 제거"""
+        listed = set(tickers)
+        with self._lock:
+            self._listed = listed
+            delisted = [ticker for ticker in self._values if ticker not in listed]
+        for ticker in delisted:
+            self.remove(ticker)
+        if delisted:
+            logger.info("상장 목록에 없는 티커 제거: %s", ", ".join(delisted))
+        return delisted
+
+    def __len__(self):
+        return len(self._values)
+
+    def coverage(self):
+        """상장 목록 중 거래대금을 수신한 마켓 비율 (상장 목록을 아직 모르면 0)"""
+        with self._lock:
+            if not self._listed:
+                return 0.0
+            return sum(ticker in self._values for ticker in self._listed) / len(self._listed)
+
+    def is_fresh(self, max_age=60, min_coverage=RANKING_MIN_COVERAGE):
+        """최근 max_age초 안에 갱신되었고 상장 목록의 min_coverage 이상을 수신했는지"""
+        return (self.last_update is not None
+                and time.time() - self.last_update <= max_age
+                and self.coverage() >= min_coverage)
+
+    def top(self, limit=10, owned_coins=None):
+        """상위 limit개 + 보유 코인 (get_top_volume_coins와 같은 형식)
+
+        아직 수신하지 못한 보유 코인은 폴링한 거래대금으로 맨 뒤에 붙입니다.
+        """
+        owned_tickers = {f"KRW-{coin}" for coin in owned_coins} if owned_coins else set()
+        with self._lock:
+            top_coins = [{'ticker': ticker, 'trading_value': -neg_value, 'rank': 0,
+                          'is_owned': ticker in owned_tickers}
+                         for neg_value, ticker in self._sorted[:limit]]
+            selected = {coin['ticker'] for coin in top_coins}
+            # 보유 코인이 상위 limit개에 없으면 거래대금 순으로 추가
+            extra = sorted((t for t in owned_tickers if t in self._values and t not in selected),
+                           key=lambda t: -self._values[t])
+            for ticker in extra:
+                top_coins.append({'ticker': ticker, 'trading_value': self._values[ticker], 'rank': 0,
+                                  'is_owned': True})
+            missing = sorted(owned_tickers - selected - set(self._values))
+
+        for ticker in missing:
+            top_coins.append({'ticker': ticker, 'trading_value': _polled_trading_value(ticker),
+                              'rank': 0, 'is_owned': True})
+        for i, coin in enumerate(top_coins, 1):
+            coin['rank'] = i
+        return top_coins
+
+    def consume(self, feed):
+        """피드가 끝나거나 stop()이 호출될 때까지 메시지를 반영"""
+        for message in feed:
+            if self._stop.is_set():
+                break
+            try:
+                if message.get('type') == 'listing':
+                    self.retain(message['codes'])
+                    continue
+                code = message['code']
+                if code.startswith('KRW-'):
+                    self.update(code, message['acc_trade_price_24h'])
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("잘못된 티커 메시지 무시: %s", e)
+
+    def start(self, feed):
+        """백그라운드 스레드에서 피드 소비 시작"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.consume, args=(feed,), daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def _polled_trading_value(ticker):
+    """스트림에 아직 없는 티커의 당일 거래대금 (조회 실패 시 0)"""
+    try:
+        candle = pyupbit.get_ohlcv(ticker, interval="day", count=1)
+        if candle is not None and not candle.empty:
+            return float(candle['volume'].iloc[0] * candle['close'].iloc[0])
+    except Exception as e:
+        logger.warning("Error getting data for %s: %s", ticker, e)
+    return 0.0
+
+
+def _listed_tickers(previous=None):
+    """KRW 마켓 목록 (조회 실패 시 이전 목록 유지)"""
+    try:
+        tickers = pyupbit.get_tickers(fiat="KRW")
+    except Exception as e:
+        logger.warning("마켓 목록 조회 실패: %s", e)
+        tickers = None
+    return tickers or previous
+
+
+def upbit_ticker_feed(tickers=None, refresh=TICKER_REFRESH_SECONDS):
+    """업비트 ticker 웹소켓 피드
+
+    처음에 구독 목록을 listing 메시지로 내보냅니다. tickers를 주지 않으면 refresh초마다
+    KRW 마켓 목록을 다시 조회해 listing 메시지를 내보내고, 목록이 바뀌면 새 목록으로
+    다시 구독합니다. 오류가 나면 재연결합니다.
+    """
+    fixed = tickers is not None
+    tickers = tickers or _listed_tickers()
+    yield {'type': 'listing', 'codes': tickers}
+    refreshed = time.monotonic()
+    while True:
+        wm = pyupbit.WebSocketManager("ticker", tickers)
+        try:
+            while True:
+                message = wm.get()
+                if message == CONNECTION_CLOSED:
+                    logger.warning("티커 웹소켓 연결 끊김 (자동 재연결)")
+                    continue
+                yield message
+                if fixed or time.monotonic() - refreshed < refresh:
+                    continue
+                refreshed = time.monotonic()
+                listed = _listed_tickers(tickers)
+                yield {'type': 'listing', 'codes': listed}
+                if set(listed) != set(tickers):
+                    logger.info("마켓 목록 변경 (%d -> %d개), 다시 구독", len(tickers), len(listed))
+                    tickers = listed
+                    break
+        except Exception as e:
+            logger.warning("티커 웹소켓 오류, 재연결: %s", e)
+            time.sleep(1)
+        finally:
+            wm.terminate()
+
+
+def replay_feed(path, speed=None):
+    """JSON Lines로 기록된 티커 메시지 재생
+
+    speed가 주어지면 기록된 timestamp(ms) 간격을 speed배 빠르게 재현하고,
+    None이면 지연 없이 바로 내보냅니다.
+    """
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            if speed and previous is not None and 'timestamp' in message:
+                time.sleep(max(0, (message['timestamp'] - previous) / 1000 / speed))
+            previous = message.get('timestamp', previous)
+            yield message
+
+
+def record_feed(feed, path, limit=None):
+    """피드 메시지를 재생용 JSON Lines 파일로 기록"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, message in enumerate(feed):
+            if limit is not None and i >= limit:
+                break
+            if message.get('type') != 'listing':
+                message = {k: message.get(k) for k in ('code', 'acc_trade_price_24h', 'timestamp')}
+            f.write(json.dumps(message) + '\n')
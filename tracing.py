@@ -0,0 +1,132 @@
+"""캔들 마감 -> 주문 체결 지연 추적
+
+run_trading_system이 실행마다 start_trace()로 트레이서를 활성화하면, 각 단계가
+span(name, **tags)으로 구간을 기록합니다. 트레이서가 없으면 span()은 아무 일도
+하지 않으므로 백테스트/대시보드 등에서는 비용이 없습니다.
+
+  - 구간: fetch(캔들 조회), compute(MRHA 계산), publish(원장/Slack 게시),
+    notion_publish(Notion 반영), order_submit(시장가 주문), order_fill(체결 확인)
+  - ticker 태그를 주지 않으면 log_context()의 ticker를 사용
+  - 각 구간은 <TRACE_DIR>/<run_id>.jsonl에 한 줄씩 기록되고, since_close는
+    캔들 마감(사이클 시작) 시각부터 구간 종료까지의 경과 시간(초)입니다.
+  - summary()/format_summary()는 구간별 p50/p95/p99와 마감->체결 지연을 요약
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from log_config import get_log_context
+
+TRACE_DIR = os.getenv('TRACE_DIR', 'state/traces')
+PERCENTILES = (50, 95, 99)
+
+_active = None
+
+
+def percentile(ordered, pct):
+    """정렬된 리스트의 nearest-rank 백분위수"""
+    if not ordered:
+        return None
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class Tracer:
+    """실행 1회의 구간 기록기 (여러 스레드에서 동시에 사용 가능)"""
+
+    def __init__(self, run_id, origin=None, root=TRACE_DIR):
+        self.run_id = run_id
+        # 캔들 마감 시각 (epoch 초)
+        self.origin = origin.timestamp() if isinstance(origin, datetime) else origin
+        self.path = os.path.join(root, f"{run_id}.jsonl")
+        self.durations = {}
+        self.close_to_fill = []
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def record(self, name, started, duration, **tags):
+        """구간 1개 기록 (started는 epoch 초, duration은 초)"""
+        ended = started + duration
+        entry = {
+            'run': self.run_id,
+            'span': name,
+            'start': datetime.fromtimestamp(started).isoformat(),
+            'duration': round(duration, 6),
+        }
+        if self.origin is not None:
+            entry['since_close'] = round(ended - self.origin, 6)
+        entry.update(tags)
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self.durations.setdefault(name, []).append(duration)
+            if name == 'order_fill' and self.origin is not None and tags.get('filled'):
+                self.close_to_fill.append(ended - self.origin)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        return entry
+
+    @contextmanager
+    def span(self, name, **tags):
+        """with 블록 소요 시간을 기록. 블록 안에서 tags를 수정해 결과를 남길 수 있음"""
+        if 'ticker' not in tags and 'ticker' in get_log_context():
+            tags['ticker'] = get_log_context()['ticker']
+        started = time.time()
+        clock = time.perf_counter()
+        try:
+            yield tags
+        except Exception as e:
+            tags['error'] = type(e).__name__
+            raise
+        finally:
+            self.record(name, started, time.perf_counter() - clock, **tags)
+
+    def summary(self):
+        """구간별 {count, p50, p95, p99, max} (초), 마감->체결은 'close_to_fill'"""
+        with self._lock:
+            series = {name: sorted(values) for name, values in self.durations.items()}
+            if self.close_to_fill:
+                series['close_to_fill'] = sorted(self.close_to_fill)
+        result = {}
+        for name, ordered in series.items():
+            stats = {'count': len(ordered), 'max': ordered[-1]}
+            for pct in PERCENTILES:
+                stats[f"p{pct}"] = percentile(ordered, pct)
+            result[name] = stats
+        return result
+
+    def format_summary(self):
+        """Slack 메시지용 지연 요약 (초 단위 p50/p95/p99)"""
+        summary = self.summary()
+        if not summary:
+            return ""
+        lines = ["⏱️ 지연 (p50 / p95 / p99, 초)"]
+        for name, stats in summary.items():
+            lines.append(f"{name}: {stats['p50']:.2f} / {stats['p95']:.2f} / {stats['p99']:.2f} "
+                         f"(n={stats['count']})")
+        return "\n".join(lines)
+
+
+def start_trace(run_id, origin=None, root=TRACE_DIR):
+    """실행 트레이서를 만들어 활성화"""
+    global _active
+    _active = Tracer(run_id, origin, root)
+    return _active
+
+
+def current_tracer():
+    return _active
+
+
+@contextmanager
+def span(name, **tags):
+    """활성 트레이서에 구간 기록 (없으면 no-op)"""
+    tracer = _active
+    if tracer is None:
+        yield tags
+        return
+    with tracer.span(name, **tags) as tags:
+        yield tags